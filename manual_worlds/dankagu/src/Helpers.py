@@ -3,10 +3,13 @@ import csv
 import os
 import pkgutil
 import json
+import sys
 
+from collections.abc import Mapping, MutableMapping
+from types import MappingProxyType
 from BaseClasses import MultiWorld, Item
 from enum import IntEnum
-from typing import Optional, List, TYPE_CHECKING, Union, get_args, get_origin, Any
+from typing import Optional, List, TYPE_CHECKING, Union, get_args, get_origin, Any, Callable
 from types import GenericAlias
 from worlds.AutoWorld import World
 from .hooks.Helpers import before_is_category_enabled, before_is_item_enabled, before_is_location_enabled
@@ -57,8 +60,12 @@ def clamp(value, min, max):
         return value
 
 def is_category_enabled(multiworld: MultiWorld, player: int, category_name: str) -> bool:
-    from .Data import category_table
     """Check if a category has been disabled by a yaml option."""
+    return get_enablement_cache(multiworld, player).is_enabled(get_category_mask((category_name,)))
+
+def _resolve_category_enabled(multiworld: MultiWorld, player: int, category_name: str) -> bool:
+    """Internal method: Check a category's hook and yaml options, is_category_enabled keeps the result for each player."""
+    from .Data import category_table
     hook_result = before_is_category_enabled(multiworld, player, category_name)
     if hook_result is not None:
         return hook_result
@@ -79,6 +86,79 @@ def resolve_yaml_option(multiworld: MultiWorld, player: int, data: dict) -> bool
                 return False
     return True
 
+# Every category is numbered the first time it's seen, so the categories of an item/location can be tested as one int
+category_ids: dict[str, int] = {}
+category_names: list[str] = []
+_category_masks: dict[tuple[str, ...], int] = {}
+
+def get_category_mask(categories: list[str] | tuple[str, ...]) -> int:
+    """Returns an int with the bit of each category's id set, cached for each distinct tuple of categories."""
+    key = categories if isinstance(categories, tuple) else tuple(categories)
+    mask = _category_masks.get(key)
+    if mask is None:
+        mask = 0
+        for category in key:
+            if category not in category_ids:
+                category_ids[category] = len(category_names)
+                category_names.append(category)
+            mask |= 1 << category_ids[category]
+        _category_masks[key] = mask
+    return mask
+
+class EnablementCache:
+    """Which categories, items and locations are enabled for a player, filled as they're asked about.\n
+    Categories are kept as bits of category_ids: each one's hook and yaml options are checked the first time it's asked about, after that it's a mask test.
+    Items and locations of the data tables are kept by name."""
+    def __init__(self, multiworld: MultiWorld, player: int):
+        self.multiworld = multiworld
+        self.player = player
+        self.checked = 0
+        self.disabled = 0
+        self.items: dict[str, bool] = {}
+        self.locations: dict[str, bool] = {}
+        self.enabled_item_names: Optional[frozenset[str]] = None
+        self.enabled_location_names: Optional[frozenset[str]] = None
+
+    def is_enabled(self, mask: int) -> bool:
+        """Returns whether every category in mask is enabled."""
+        unchecked = mask & ~self.checked
+        while unchecked:
+            bit = unchecked & -unchecked
+            if not _resolve_category_enabled(self.multiworld, self.player, category_names[bit.bit_length() - 1]):
+                self.disabled |= bit
+            self.checked |= bit
+            unchecked ^= bit
+        return not mask & self.disabled
+
+def get_enablement_cache(multiworld: MultiWorld, player: int) -> EnablementCache:
+    world = multiworld.worlds[player]
+    if world.enablement_cache is None:
+        world.enablement_cache = EnablementCache(multiworld, player)
+    return world.enablement_cache
+
+def reset_enablement_cache_for_player(world: World, player: Optional[int] = None):
+    """Forget which categories, items and locations are enabled for the player, so they're checked again the next time they're asked about.\n
+    Hooks need to call this if they change what is enabled (options, hook results...) after something was checked."""
+    if player is None:
+        player = world.player
+    world.multiworld.worlds[player].enablement_cache = None
+
+def get_enabled_item_names(multiworld: MultiWorld, player: int) -> frozenset[str]:
+    """Return the names of every item of item_table that is enabled for the player."""
+    cache = get_enablement_cache(multiworld, player)
+    if cache.enabled_item_names is None:
+        cache.enabled_item_names = frozenset(item["name"] for item in multiworld.worlds[player].item_table
+                                             if is_item_enabled(multiworld, player, item))
+    return cache.enabled_item_names
+
+def get_enabled_location_names(multiworld: MultiWorld, player: int) -> frozenset[str]:
+    """Return the names of every location of location_table that is enabled for the player."""
+    cache = get_enablement_cache(multiworld, player)
+    if cache.enabled_location_names is None:
+        cache.enabled_location_names = frozenset(location["name"] for location in multiworld.worlds[player].location_table
+                                                 if is_location_enabled(multiworld, player, location))
+    return cache.enabled_location_names
+
 def is_item_name_enabled(multiworld: MultiWorld, player: int, item_name: str) -> bool:
     """Check if an item named 'item_name' has been disabled by a yaml option."""
     item = multiworld.worlds[player].item_name_to_item.get(item_name, {})
@@ -88,7 +168,19 @@ def is_item_name_enabled(multiworld: MultiWorld, player: int, item_name: str) ->
     return is_item_enabled(multiworld, player, item)
 
 def is_item_enabled(multiworld: MultiWorld, player: int, item: "ManualItem") -> bool:
-    """Check if an item has been disabled by a yaml option."""
+    """Check if an item has been disabled by a yaml option.
+    \nThe result for an item of item_table is kept until reset_enablement_cache_for_player is called."""
+    item_name = item.get("name")
+    is_table_item = multiworld.worlds[player].item_name_to_item.get(item_name) is item
+    if is_table_item:
+        cache = get_enablement_cache(multiworld, player)
+        if item_name not in cache.items:
+            cache.items[item_name] = _resolve_item_enabled(multiworld, player, item)
+        return cache.items[item_name]
+
+    return _resolve_item_enabled(multiworld, player, item)
+
+def _resolve_item_enabled(multiworld: MultiWorld, player: int, item: "ManualItem") -> bool:
     hook_result = before_is_item_enabled(multiworld, player, item)
     if hook_result is not None:
         return hook_result
@@ -104,7 +196,19 @@ def is_location_name_enabled(multiworld: MultiWorld, player: int, location_name:
     return is_location_enabled(multiworld, player, location)
 
 def is_location_enabled(multiworld: MultiWorld, player: int, location: "ManualLocation") -> bool:
-    """Check if a location has been disabled by a yaml option."""
+    """Check if a location has been disabled by a yaml option.
+    \nThe result for a location of location_table is kept until reset_enablement_cache_for_player is called."""
+    location_name = location.get("name")
+    is_table_location = multiworld.worlds[player].location_name_to_location.get(location_name) is location
+    if is_table_location:
+        cache = get_enablement_cache(multiworld, player)
+        if location_name not in cache.locations:
+            cache.locations[location_name] = _resolve_location_enabled(multiworld, player, location)
+        return cache.locations[location_name]
+
+    return _resolve_location_enabled(multiworld, player, location)
+
+def _resolve_location_enabled(multiworld: MultiWorld, player: int, location: "ManualLocation") -> bool:
     hook_result = before_is_location_enabled(multiworld, player, location)
     if hook_result is not None:
         return hook_result
@@ -115,13 +219,11 @@ def _is_manualobject_enabled(multiworld: MultiWorld, player: int, object: Any) -
     """Internal method: Check if a Manual Object has any category disabled by a yaml option.
     \nPlease use the proper is_'item/location'_enabled or is_'item/location'_name_enabled methods instead.
     """
-    enabled = True
-    for category in object.get("category", []):
-        if not is_category_enabled(multiworld, player, category):
-            enabled = False
-            break
+    categories = object.get("category")
+    if not categories:
+        return True
 
-    return enabled
+    return get_enablement_cache(multiworld, player).is_enabled(get_category_mask(categories))
 
 def get_items_for_player(multiworld: MultiWorld, player: int, includePrecollected: bool = False) -> List[Item]:
     """Return list of items of a player including placed items"""
@@ -232,6 +334,24 @@ def format_state_prog_items_key(category: str|ProgItemsCat ,key: str) -> str:
 
     return f"MANUAL_{cat_key}_{format_to_valid_identifier(key.lower())}"
 
+def format_category_prog_items_key(category: str) -> str:
+    """The state.prog_items key ManualWorld.collect/remove keep the collected item count of a category in.
+    Unlike format_state_prog_items_key the category name is kept as is, so two different categories never share a key.
+
+    Example: Big Tools -> MANUAL_CATEGORY_Big Tools
+    """
+    return f"MANUAL_{ProgItemsCat.CATEGORY.name}_{category}"
+
+def state_independent(func: Callable) -> Callable:
+    """Decorator for requirement functions whose result only depends on the player's options and never on the CollectionState.
+    \nThose are called once per player when the rules are set and their result replaces the {function()} in the requires, unless the world sets rules_short_circuit to False.
+    \nIf the function asks for a CollectionState it will receive None."""
+    func.manual_state_independent = True
+    return func
+
+def is_state_independent(func: Callable) -> bool:
+    return getattr(func, "manual_state_independent", False)
+
 def convert_string_to_type(input: str, target_type: type) -> Any:
     """Take a string and attempt to convert it to {target_type}
     \ntarget_type can be a single type(ex. str), an union (int|str), an Optional type (Optional[str]) or a combo of any of those (Optional[int|str])
@@ -316,3 +436,102 @@ def convert_string_to_type(input: str, target_type: type) -> Any:
 
     newline = "\n"
     raise Exception(f"'{value}' could not be converted to {target_type}, here's the conversion failure message(s):\n\n{newline.join([' - ' + str(validation_error) for validation_error in errors])}\n\n")
+
+class LazyLookup(Mapping):
+    """A read-only dict that is only built the first time it's used, for lookups that loading the apworld (eg. for the Launcher or the client) doesn't need."""
+    def __init__(self, build: Callable[[], dict]):
+        self._build = build
+        self._lookup: Optional[dict] = None
+
+    @property
+    def lookup(self) -> dict:
+        if self._lookup is None:
+            self._lookup = self._build()
+        return self._lookup
+
+    def __getitem__(self, key):
+        return self.lookup[key]
+
+    def __contains__(self, key) -> bool:
+        return key in self.lookup
+
+    def __iter__(self):
+        return iter(self.lookup)
+
+    def __len__(self) -> int:
+        return len(self.lookup)
+
+    def get(self, key, default=None):
+        return self.lookup.get(key, default)
+
+    def __repr__(self) -> str:
+        return repr(self.lookup)
+
+
+_NO_EXTRA_KEYS = MappingProxyType({})
+"""Shared by every record without an extra key, instead of one empty dict each. Replaced by a dict when a key is added"""
+
+class ManualRecord(MutableMapping):
+    """An item/location of the data tables, kept in __slots__ instead of a dict to save memory when there are thousands of them.\n
+    It reads and writes like the dict it was made from, keys that don't have a slot are kept in a small dict of their own.
+    Values are stored as given, so hooks can keep editing them in place (eg. item["category"].append(...))."""
+    __slots__ = ("_extra",)
+    fields: frozenset[str] = frozenset()
+
+    def __init__(self, data: dict):
+        self._extra = _NO_EXTRA_KEYS
+        for key, value in data.items():
+            self[key] = value
+
+    def __getitem__(self, key):
+        if key in self.fields:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        return self._extra[key]
+
+    def get(self, key, default=None):
+        if key in self.fields:
+            return getattr(self, key, default)
+        return self._extra.get(key, default)
+
+    def __contains__(self, key) -> bool:
+        if key in self.fields:
+            return hasattr(self, key)
+        return key in self._extra
+
+    def __setitem__(self, key, value):
+        if key == "category" and isinstance(value, list):
+            # the same few category names are repeated by thousands of entries, keep a single copy of each
+            value[:] = [sys.intern(category) if type(category) is str else category for category in value]
+
+        if key in self.fields:
+            setattr(self, key, value)
+        else:
+            if self._extra is _NO_EXTRA_KEYS:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        if key in self.fields:
+            delattr(self, key)
+        else:
+            del self._extra[key]
+
+    def __iter__(self):
+        for key in self.__slots__:
+            if hasattr(self, key):
+                yield key
+        yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def copy(self) -> dict:
+        return dict(self)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)!r})"
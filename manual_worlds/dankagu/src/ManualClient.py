@@ -72,7 +72,7 @@ class ManualContext(SuperContext):
     region_table = {}
     category_table = {}
 
-    tracker_reachable_locations = []
+    tracker_reachable_locations = set()
     tracker_reachable_events = []
 
     set_deathlink = False
@@ -220,7 +220,8 @@ class ManualContext(SuperContext):
         self.ui.death_link_button.background_color = self.colors['deathlink_received']
 
     def on_tracker_updated(self, reachable_locations: list[str]):
-        self.tracker_reachable_locations = reachable_locations
+        # only ever used for membership checks while refreshing every location button
+        self.tracker_reachable_locations = set(reachable_locations)
         self.ui.request_update_tracker_and_locations_table(update_highlights=True)
 
     def on_tracker_events(self, events: list[str]):
@@ -3,6 +3,7 @@ from typing import NotRequired, TypedDict
 from .songs import songs
 from .world import WorldSpec
 from .map import map_graph
+from ..Requires import escape_requires_name
 
 
 def __define_world_spec():
@@ -185,9 +186,7 @@ def __define_world_spec():
             or base_songs_category
         )
 
-    for song_index, (song_name, group_names) in enumerate(groups_by_song.items()):
-        (song_category, _) = spec.define_category(f"Song {song_index}", hidden=True)
-
+    for song_name, group_names in groups_by_song.items():
         for song_group_name in group_names:
             item_name = song_name
             if item_name in spec.items:
@@ -195,18 +194,14 @@ def __define_world_spec():
 
             spec.define_item(
                 item_name,
-                category=[songs_category, song_group_name, song_category],
+                category=[songs_category, song_group_name],
                 progression=True,
             )
 
-            song_requires = f"|{item_name}|"
-            if any(char in item_name for char in ":|"):
-                song_requires = f"|@{song_category}|"
-
             spec.define_location(
                 item_name,
-                category=[songs_category, song_group_name, song_category],
-                requires=song_requires,
+                category=[songs_category, song_group_name],
+                requires=f"|{escape_requires_name(item_name)}|",
             )
 
     spec.game["starting_items"] = [
@@ -1,7 +1,7 @@
 from BaseClasses import Entrance, MultiWorld, Region
-from .Helpers import is_category_enabled, is_location_enabled
+from .Helpers import LazyLookup, get_enabled_location_names
 from .Data import region_table
-from .Locations import ManualLocation, location_name_to_location
+from .Locations import ManualLocation, location_name_to_location, location_table
 from worlds.AutoWorld import World
 
 
@@ -19,8 +19,20 @@ regionMap["Manual"] = {
     "connects_to": starting_regions
 }
 
+# The names of each region's locations, in location_table order, built once for every player
+def build_region_location_names() -> dict[str, tuple[str, ...]]:
+    region_locations: dict[str, list[str]] = {}
+    for location in location_table:
+        if "region" in location:
+            region_locations.setdefault(location["region"], []).append(location["name"])
+    return {region: tuple(names) for region, names in region_locations.items()}
+
+region_location_names: LazyLookup = LazyLookup(build_region_location_names)
+
 
 def create_regions(world: World, multiworld: MultiWorld, player: int):
+    enabled_location_names = get_enabled_location_names(multiworld, player)
+
     # Create regions and assign locations to each region
     for region in regionMap:
         if "connects_to" not in regionMap[region]:
@@ -32,11 +44,7 @@ def create_regions(world: World, multiworld: MultiWorld, player: int):
         if not exit_array:
             exit_array = None
 
-        locations = []
-        for location in world.location_table:
-            if "region" in location and location["region"] == region:
-                if is_location_enabled(multiworld, player, location):
-                    locations.append(location["name"])
+        locations = [name for name in region_location_names.get(region, ()) if name in enabled_location_names]
 
         new_region = create_region(world, multiworld, player, region, locations, exit_array)
         multiworld.regions += [new_region]
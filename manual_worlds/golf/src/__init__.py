@@ -11,16 +11,19 @@ from worlds.LauncherComponents import Component, SuffixIdentifier, components, T
 
 from .Data import item_table, location_table, region_table, category_table
 from .Game import game_name, filler_item_name, starting_items
-from .Meta import world_description, world_webworld, enable_region_diagram
+from .Meta import world_description, world_webworld, enable_region_diagram, enable_stage_profiler, enable_stage_memory_profiler
+from .Profiling import RequiresProfiler, StageProfiler, profile_stage, profile_hook
+from .Compiled import CompiledWorld, compiled_world
 from .Locations import location_id_to_name, location_name_to_id, location_name_to_location, location_name_groups, victory_names
-from .Items import item_id_to_name, item_name_to_id, item_name_to_item, item_name_groups
+from .Items import item_id_to_name, item_name_to_id, item_name_to_item, item_name_groups, category_item_names, item_prog_items_deltas
 from .DataValidation import runGenerationDataValidation, runPreFillDataValidation
 
 from .Regions import create_regions
 from .Items import ManualItem
 from .Rules import set_rules
 from .Options import manual_options_data
-from .Helpers import is_item_enabled, get_option_value, get_items_for_player, resolve_yaml_option, format_state_prog_items_key, ProgItemsCat
+from .Helpers import get_option_value, get_items_for_player, resolve_yaml_option, \
+    EnablementCache, get_enabled_item_names, get_enabled_location_names
 
 from BaseClasses import CollectionState, ItemClassification, Item
 from Options import PerGameCommonOptions
@@ -35,7 +38,16 @@ from .hooks.World import \
     before_fill_slot_data, after_fill_slot_data, before_write_spoiler, \
     before_extend_hint_information, after_extend_hint_information, \
     after_collect_item, after_remove_item
-from .hooks.Data import hook_interpret_slot_data
+
+# The hooks called once per stage are timed by the stage profiler too, the ones called for every item (create_item, collect, remove) aren't
+before_create_regions, after_create_regions = profile_hook(before_create_regions), profile_hook(after_create_regions)
+before_create_items_all, before_create_items_starting = profile_hook(before_create_items_all), profile_hook(before_create_items_starting)
+before_create_items_filler, after_create_items = profile_hook(before_create_items_filler), profile_hook(after_create_items)
+before_set_rules, after_set_rules = profile_hook(before_set_rules), profile_hook(after_set_rules)
+before_generate_basic, after_generate_basic = profile_hook(before_generate_basic), profile_hook(after_generate_basic)
+before_fill_slot_data, after_fill_slot_data = profile_hook(before_fill_slot_data), profile_hook(after_fill_slot_data)
+before_write_spoiler = profile_hook(before_write_spoiler)
+before_extend_hint_information, after_extend_hint_information = profile_hook(before_extend_hint_information), profile_hook(after_extend_hint_information)
 
 class ManualWorld(World):
     __doc__ = world_description
@@ -55,6 +67,11 @@ class ManualWorld(World):
     item_name_to_id = item_name_to_id
     item_name_to_item = item_name_to_item
     item_name_groups = item_name_groups
+    category_item_names = category_item_names
+    item_prog_items_deltas = item_prog_items_deltas
+
+    # Built once and shared by every player of this game, see Compiled.py
+    compiled_world: CompiledWorld = compiled_world
 
     filler_item_name = filler_item_name
 
@@ -85,6 +102,8 @@ class ManualWorld(World):
                 getattr(self.options, key).value = value
                 regen = True
 
+        # imported here so hooks/Data.py (and whatever it imports) only runs when needed, Data.py skips it when it loads the data snapshot
+        from .hooks.Data import hook_interpret_slot_data
         regen = hook_interpret_slot_data(self, self.player, slot_data) or regen
         return regen
 
@@ -93,6 +112,12 @@ class ManualWorld(World):
         runGenerationDataValidation(cls)
 
 
+    def generate_early(self) -> None:
+        # Enable this in Meta.json to get a timeline of the time (and with enable_stage_memory_profiler, memory) spent in every stage and hook of this world
+        if enable_stage_profiler:
+            self.stage_profiler = StageProfiler(self.game, self.player, self.multiworld.get_player_name(self.player), enable_stage_memory_profiler)
+
+    @profile_stage
     def create_regions(self):
         before_create_regions(self, self.multiworld, self.player)
 
@@ -109,11 +134,13 @@ class ManualWorld(World):
 
         after_create_regions(self, self.multiworld, self.player)
 
+    @profile_stage
     def create_items(self):
         # Generate item pool
         pool: list[Item] = []
         traps = []
         configured_item_names = self.item_id_to_name.copy()
+        enabled_item_names = self.get_enabled_item_names()
 
         items_config: dict[str, int|dict[ItemClassification | str | int, int]] = {}
         for name in configured_item_names.values():
@@ -126,9 +153,8 @@ class ManualWorld(World):
             if item.get("trap"):
                 traps.append(name)
 
-            if "category" in item:
-                if not is_item_enabled(self.multiworld, self.player, item):
-                    item_count = 0
+            if "category" in item and name not in enabled_item_names:
+                item_count = 0
 
             items_config[name] = item_count
 
@@ -138,9 +164,7 @@ class ManualWorld(World):
             total_created = 0
             if type(configs) is int:
                 total_created = configs
-                for _ in range(configs):
-                    new_item = self.create_item(name)
-                    pool.append(new_item)
+                pool.extend(self.create_item(name) for _ in range(configs))
             elif type(configs) is dict:
                 for cat, count in configs.items():
                     total_created += count
@@ -157,9 +181,7 @@ class ManualWorld(World):
                         except Exception as ex:
                             raise Exception(f"Item override '{cat}' for {name} improperly defined\n\n{type(ex).__name__}:{ex}")
 
-                    for _ in range(count):
-                        new_item = self.create_item(name, true_class)
-                        pool.append(new_item)
+                    pool.extend(self.create_item(name, true_class) for _ in range(count))
             else:
                 raise Exception(f"Item override for {name} improperly defined")
 
@@ -202,21 +224,21 @@ class ManualWorld(World):
                 # if there's a condition on having a previous item, check for any of them
                 # if not found in items started, this starting item rule shouldn't execute, and check the next one
                 if "if_previous_item" in starting_item_block:
-                    matching_items = [item for item in items_started if item.name in starting_item_block["if_previous_item"]]
-
-                    if len(matching_items) == 0:
+                    previous_item_names = set(starting_item_block["if_previous_item"])
+                    if not any(item.name in previous_item_names for item in items_started):
                         continue
 
                 # start with the full pool of items
-                items = pool
+                items = list(pool)
 
                 # if the setting lists specific item names, limit the items to just those
                 if "items" in starting_item_block:
-                    items = [item for item in pool if item.name in starting_item_block["items"]]
+                    block_item_names = set(starting_item_block["items"])
+                    items = [item for item in pool if item.name in block_item_names]
 
                 # if the setting lists specific item categories, limit the items to ones that have any of those categories
                 if "item_categories" in starting_item_block:
-                    items_in_categories = [item["name"] for item in self.item_name_to_item.values() if "category" in item and len(set(starting_item_block["item_categories"]).intersection(item["category"])) > 0]
+                    items_in_categories = {name for category in starting_item_block["item_categories"] for name in self.category_item_names.get(category, ())}
                     items = [item for item in pool if item.name in items_in_categories]
 
                 self.random.shuffle(items)
@@ -228,9 +250,12 @@ class ManualWorld(World):
                 for starting_item in items:
                     items_started.append(starting_item)
                     self.multiworld.push_precollected(starting_item)
-                    pool.remove(starting_item)
 
-        self.start_inventory = {i.name: items_started.count(i) for i in items_started}
+                # removed by identity in one pass, instead of one pool.remove (a scan of the pool) per item
+                started_ids = {id(item) for item in items}
+                pool = [item for item in pool if id(item) not in started_ids]
+
+        self.start_inventory = dict(Counter(item.name for item in items_started))
 
         pool = before_create_items_filler(pool, self, self.multiworld, self.player)
         pool = self.adjust_filler_items(pool, traps)
@@ -271,25 +296,31 @@ class ManualWorld(World):
 
         return item_object
 
-    # Item Value need a tweaked collect and remove:
+    # Item Value and category counts need a tweaked collect and remove:
     def collect(self, state: CollectionState, item: Item) -> bool:
         change = super().collect(state, item)
-        manual_item = self.item_name_to_item.get(item.name, {})
-        if change and manual_item.get("value"):
-            for key, value in manual_item["value"].items():
-                state.prog_items[item.player][format_state_prog_items_key(ProgItemsCat.VALUE, key)] += int(value)
+        if change:
+            # |@Category:N| requires check the category totals directly instead of counting every item of the category
+            deltas = self.item_prog_items_deltas.get(item.name)
+            if deltas:
+                prog_items = state.prog_items[item.player]
+                for key, delta in deltas:
+                    prog_items[key] += delta
         after_collect_item(self, state, change, item)
         return change
 
     def remove(self, state: CollectionState, item: Item) -> bool:
         change = super().remove(state, item)
-        manual_item = self.item_name_to_item.get(item.name, {})
-        if change and manual_item.get("value"):
-            for key, value in manual_item["value"].items():
-                state.prog_items[item.player][format_state_prog_items_key(ProgItemsCat.VALUE, key)] -= int(value)
+        if change:
+            deltas = self.item_prog_items_deltas.get(item.name)
+            if deltas:
+                prog_items = state.prog_items[item.player]
+                for key, delta in deltas:
+                    prog_items[key] -= delta
         after_remove_item(self, state, change, item)
         return change
 
+    @profile_stage
     def set_rules(self):
         before_set_rules(self, self.multiworld, self.player)
 
@@ -297,6 +328,7 @@ class ManualWorld(World):
 
         after_set_rules(self, self.multiworld, self.player)
 
+    @profile_stage
     def generate_basic(self):
         before_generate_basic(self, self.multiworld, self.player)
 
@@ -304,66 +336,50 @@ class ManualWorld(World):
         manual_locations_with_forbid = {location['name']: location for location in location_name_to_location.values() if "dont_place_item" in location or "dont_place_item_category" in location}
         locations_with_forbid = [l for l in self.multiworld.get_unfilled_locations(player=self.player) if l.name in manual_locations_with_forbid.keys()]
         for location in locations_with_forbid:
-            manual_location = manual_locations_with_forbid[location.name]
-            forbidden_item_names = []
-
-            if manual_location.get("dont_place_item"):
-                forbidden_item_names.extend([i["name"] for i in item_name_to_item.values() if i["name"] in manual_location["dont_place_item"]])
-
-            if manual_location.get("dont_place_item_category"):
-                forbidden_item_names.extend([i["name"] for i in item_name_to_item.values() if "category" in i and set(i["category"]).intersection(manual_location["dont_place_item_category"])])
-
+            forbidden_item_names = self.compiled_world.get_placement(manual_locations_with_forbid[location.name]).forbidden_item_names
             if forbidden_item_names:
                 forbid_items_for_player(location, set(forbidden_item_names), self.player)
 
         # Handle specific item placements using fill_restrictive
         manual_locations_with_placements = {location['name']: location for location in location_name_to_location.values() if "place_item" in location or "place_item_category" in location}
         locations_with_placements = [l for l in self.multiworld.get_unfilled_locations(player=self.player) if l.name in manual_locations_with_placements.keys()]
+
+        # this player's items left in the pool by name, so each placement doesn't scan the whole multiworld's pool
+        pool_items_by_name: dict[str, list[Item]] = {}
+        if locations_with_placements:
+            for item in self.multiworld.itempool:
+                if item.player == self.player:
+                    pool_items_by_name.setdefault(item.name, []).append(item)
+        placed_item_ids: set[int] = set()
+
         for location in locations_with_placements:
             manual_location = manual_locations_with_placements[location.name]
-            eligible_items = []
-            eligible_item_names = []
-            forbidden_item_names = []
-            place_messages = []
-            forbid_messages = []
-
-            #First we get possible items names
-            if manual_location.get("place_item"):
-                eligible_item_names += manual_location["place_item"]
-                place_messages.append('", "'.join(manual_location["place_item"]))
-
-            if manual_location.get("place_item_category"):
-                eligible_item_names += [i["name"] for i in item_name_to_item.values() if "category" in i and set(i["category"]).intersection(manual_location["place_item_category"])]
-                place_messages.append('", "'.join(manual_location["place_item_category"]) + " category(ies)")
-
-            # Second we check for forbidden items names
-            if manual_location.get("dont_place_item"):
-                forbidden_item_names += manual_location["dont_place_item"]
-                forbid_messages.append('", "'.join(manual_location["dont_place_item"]) + ' items')
-
-            if manual_location.get("dont_place_item_category"):
-                forbidden_item_names += [i["name"] for i in item_name_to_item.values() if "category" in i and set(i["category"]).intersection(manual_location["dont_place_item_category"])]
-                forbid_messages.append('", "'.join(manual_location["dont_place_item_category"]) + ' category(ies)')
-
-            # If we forbid some names, check for those in the possible names and remove them
-            if forbidden_item_names:
-                eligible_item_names = [name for name in eligible_item_names if name not in forbidden_item_names]
-
-            if eligible_item_names:
-                eligible_items = [item for item in self.multiworld.itempool if item.player == self.player and item.name in eligible_item_names]
+            # the names allowed by the place and dont_place keys, resolved once for every location and player with the same keys
+            placement = self.compiled_world.get_placement(manual_location)
+            eligible_pools = [pool_items_by_name[name] for name in placement.eligible_item_names if pool_items_by_name.get(name)]
+            eligible_count = sum(len(items) for items in eligible_pools)
 
-            if len(eligible_items) == 0:
+            if eligible_count == 0:
                 nl = "\n"
-                if forbidden_item_names:
-                    raise Exception(f'Could not find a suitable item to place at "{manual_location["name"]}".\n    No items that match "{f"{nl}     or ".join(place_messages)}"\n    Maybe because of forbidden "{f"{nl}     or ".join(forbid_messages)}"')
-                raise Exception(f'Could not find a suitable item to place at "{manual_location["name"]}". \n    No items that match "{f"{nl}     or ".join(place_messages)}"')
-
-            item_to_place = self.random.choice(eligible_items)
+                if placement.forbidden_item_names:
+                    raise Exception(f'Could not find a suitable item to place at "{manual_location["name"]}".\n    No items that match "{f"{nl}     or ".join(placement.place_messages)}"\n    Maybe because of forbidden "{f"{nl}     or ".join(placement.forbid_messages)}"')
+                raise Exception(f'Could not find a suitable item to place at "{manual_location["name"]}". \n    No items that match "{f"{nl}     or ".join(placement.place_messages)}"')
+
+            # pick uniformly among every eligible item, then take it out of its name's list by swapping it with the last one
+            index = self.random.randrange(eligible_count)
+            for items in eligible_pools:
+                if index < len(items):
+                    break
+                index -= len(items)
+            item_to_place = items[index]
+            items[index] = items[-1]
+            items.pop()
             location.place_locked_item(item_to_place)
+            placed_item_ids.add(id(item_to_place))
 
-            # remove the item we're about to place from the pool so it isn't placed twice
-            self.multiworld.itempool.remove(item_to_place)
-
+        # remove the items we placed from the pool so they aren't placed twice, in one pass instead of one remove per item
+        if placed_item_ids:
+            self.multiworld.itempool[:] = [item for item in self.multiworld.itempool if id(item) not in placed_item_ids]
 
         after_generate_basic(self, self.multiworld, self.player)
 
@@ -372,10 +388,12 @@ class ManualWorld(World):
             from Utils import visualize_regions
             visualize_regions(self.multiworld.get_region("Menu", self.player), f"{self.game}_{self.player}.puml")
 
+    @profile_stage
     def pre_fill(self):
         # DataValidation after all the hooks are done but before fill
         runPreFillDataValidation(self, self.multiworld)
 
+    @profile_stage
     def fill_slot_data(self):
         slot_data = before_fill_slot_data({}, self, self.multiworld, self.player)
 
@@ -390,15 +408,29 @@ class ManualWorld(World):
 
         return slot_data
 
+    @profile_stage
     def generate_output(self, output_directory: str):
+        if self.stage_profiler:
+            self.stage_profiler.output_path = os.path.join(output_directory, f"{self.multiworld.get_out_file_name_base(self.player)}_stages.json")
+
         data = self.client_data()
         filename = f"{self.multiworld.get_out_file_name_base(self.player)}.apmanual"
         with open(os.path.join(output_directory, filename), 'wb') as f:
-            f.write(b64encode(bytes(json.dumps(data), 'utf-8')))
+            # the item/location records are written like the dicts they replace
+            f.write(b64encode(bytes(json.dumps(data, default=dict), 'utf-8')))
 
+        # Enable this in Meta.json to get a report of the time spent checking every location/region's requires during generation
+        if self.requires_profiler:
+            report_path = os.path.join(output_directory, f"{self.multiworld.get_out_file_name_base(self.player)}_requires_profile.txt")
+            with open(report_path, "w", encoding="utf-8") as f:
+                f.write(self.requires_profiler.report())
+            logging.info(f"{self.game}: requires profile of player {self.player} written to {report_path}")
+
+    @profile_stage
     def write_spoiler(self, spoiler_handle):
         before_write_spoiler(self, self.multiworld, spoiler_handle)
 
+    @profile_stage
     def extend_hint_information(self, hint_data: dict[int, dict[int, str]]) -> None:
         before_extend_hint_information(hint_data, self, self.multiworld, self.player)
 
@@ -421,6 +453,12 @@ class ManualWorld(World):
     The maximum time a location/region's requirement can loop to check for functions\n
     One thing to remember is the more you loop the longer generation will take. So probably leave it as is unless you really needs it."""
 
+    rules_short_circuit: bool = True
+    """Default: True\n
+    When True, AND/OR in a location/region's requires stop at the first operand that decides the result, checking items and categories before functions\n
+    Set it to False if you rely on every function of a requires being called on every check, like the requires evaluation did before.
+    That includes functions marked @state_independent, which are otherwise called once per player in set_rules."""
+
     def add_filler_items(self, item_pool, traps):
         Utils.deprecate("Use adjust_filler_items instead.")
         return self.adjust_filler_items(item_pool, traps)
@@ -436,30 +474,34 @@ class ManualWorld(World):
             trap_count = extras * trap_percent // 100
             filler_count = extras - trap_count
 
-            for _ in range(0, trap_count):
-                extra_item = self.create_item(self.random.choice(traps))
-                item_pool.append(extra_item)
-
-            for _ in range(0, filler_count):
-                extra_item = self.create_item(self.get_filler_item_name())
-                item_pool.append(extra_item)
+            item_pool.extend(self.create_item(self.random.choice(traps)) for _ in range(trap_count))
+            item_pool.extend(self.create_item(self.get_filler_item_name()) for _ in range(filler_count))
         elif extras < 0:
             logging.warning(f"{self.game} has more items than locations. {abs(extras)} non-progression items will be removed at random.")
             # Filler is only assigned if the item doesn't have any other tags, so it only has to be covered by itself.
             # Skip Balancing is also not covered due to how it's only supported when paired with Progression.
             # As a result, these cover every possible combination can be removed.
-            fillers = [item for item in item_pool if item.classification == ItemClassification.filler]
-            traps = [item for item in item_pool if item.classification == ItemClassification.trap]
-            useful = [item for item in item_pool if item.classification == ItemClassification.useful]
+            fillers = []
+            traps = []
+            useful = []
             # Useful + Trap is classified separately so that it can have a unique priority ranking.
-            useful_traps = [item for item in item_pool if
-                            ItemClassification.progression not in item.classification
-                            and ItemClassification.useful in item.classification
-                            and ItemClassification.trap in item.classification]
+            useful_traps = []
+            for item in item_pool:
+                if item.classification == ItemClassification.filler:
+                    fillers.append(item)
+                elif item.classification == ItemClassification.trap:
+                    traps.append(item)
+                elif item.classification == ItemClassification.useful:
+                    useful.append(item)
+                elif ItemClassification.progression not in item.classification \
+                        and ItemClassification.useful in item.classification \
+                        and ItemClassification.trap in item.classification:
+                    useful_traps.append(item)
             self.random.shuffle(fillers)
             self.random.shuffle(traps)
             self.random.shuffle(useful)
             self.random.shuffle(useful_traps)
+            removed_ids: set[int] = set()
             for _ in range(0, abs(extras)):
                 popped = None
                 if fillers:
@@ -473,10 +515,31 @@ class ManualWorld(World):
                 else:
                     logging.warning("Could not remove enough non-progression items from the pool.")
                     break
-                item_pool.remove(popped)
+                removed_ids.add(id(popped))
+
+            # removed by identity in one pass, instead of one item_pool.remove (a scan of the pool) per item
+            item_pool[:] = [item for item in item_pool if id(item) not in removed_ids]
 
         return item_pool
 
+    stage_profiler: Optional[StageProfiler] = None
+    """Set by generate_early when "enable_stage_profiler" is enabled in meta.json, or the MANUAL_PROFILE_STAGES environment variable is set"""
+
+    enablement_cache: Optional[EnablementCache] = None
+    """Set by the first is_category/item/location_enabled check, which of this player's categories, items and locations are enabled.\n
+    Cleared by reset_enablement_cache_for_player"""
+
+    def get_enabled_item_names(self) -> frozenset[str]:
+        """Returns the names of this player's enabled items, see Helpers.get_enabled_item_names"""
+        return get_enabled_item_names(self.multiworld, self.player)
+
+    def get_enabled_location_names(self) -> frozenset[str]:
+        """Returns the names of this player's enabled locations, see Helpers.get_enabled_location_names"""
+        return get_enabled_location_names(self.multiworld, self.player)
+
+    requires_profiler: Optional[RequiresProfiler] = None
+    """Set by set_rules when "enable_requires_profiler" is enabled in meta.json, or the MANUAL_PROFILE_REQUIRES environment variable is set"""
+
     def get_item_counts(self, player: Optional[int] = None, pool: list[Item] | None | bool = None, only_progression: bool = False) -> Counter[str]:
         """Returns the player real item counts.\n
         If you provide an item pool using the pool argument, then it's item counts will be returned.
@@ -506,7 +569,7 @@ class ManualWorld(World):
             'player_name': self.multiworld.get_player_name(self.player),
             'player_id': self.player,
             'items': self.item_name_to_item,
-            'locations': self.location_name_to_location,
+            'locations': dict(self.location_name_to_location),
             # todo: extract connections out of multiworld.get_regions() instead, in case hooks have modified the regions.
             'regions': region_table,
             'categories': category_table
@@ -1,6 +1,27 @@
+from unittest import SkipTest
+from unittest.mock import patch
+
 from test.TestBase import WorldTestBase
-from .Game import game_name
+from .Game import game_name, filler_item_name
+from .Data import location_table
+from . import ManualWorld
 
 
 class ManualTest(WorldTestBase):
     game = game_name
+
+
+class TestUnfilteredStartingItems(WorldTestBase):
+    """A starting_items block without items, item_categories or random starts with the whole pool"""
+    game = game_name
+
+    def world_setup(self, *args, **kwargs):
+        if any("place_item" in location or "place_item_category" in location for location in location_table):
+            raise SkipTest("the placed items wouldn't be left in the pool")
+        with patch(f"{ManualWorld.__module__}.starting_items", [{}]):
+            super().world_setup(*args, **kwargs)
+
+    def test_whole_pool_started(self):
+        self.assertTrue(self.multiworld.precollected_items[self.player])
+        left_in_pool = [item.name for item in self.multiworld.itempool if item.player == self.player and item.name != filler_item_name]
+        self.assertEqual(left_in_pool, [])
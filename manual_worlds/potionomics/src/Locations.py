@@ -1,6 +1,14 @@
 from BaseClasses import Location
 from .Data import location_table
 from .Game import starting_index
+from .Helpers import LazyLookup, ManualRecord
+
+
+class ManualLocationRecord(ManualRecord):
+    """A location of location_table, read and written like a dict but stored in slots"""
+    __slots__ = ("name", "id", "region", "category", "requires", "victory", "place_item", "place_item_category",
+                 "dont_place_item", "dont_place_item_category", "prehint", "hint_entrance")
+    fields = frozenset(__slots__)
 
 
 ######################
@@ -11,24 +19,24 @@ count = starting_index
 victory_names: list[str] = []
 
 # add sequential generated ids to the lists
-for key, _ in enumerate(location_table):
-    if "victory" in location_table[key] and location_table[key]["victory"]:
-        victory_names.append(location_table[key]["name"])
+for location in location_table:
+    if "victory" in location and location["victory"]:
+        victory_names.append(location["name"])
 
-    if "id" in location_table[key]:
-        item_id = location_table[key]["id"]
+    if "id" in location:
+        item_id = location["id"]
         if item_id >= count:
             count = item_id
         else:
-            raise ValueError(f"{location_table[key]['name']} has an invalid ID. ID must be at least {count + 1}")
+            raise ValueError(f"{location['name']} has an invalid ID. ID must be at least {count + 1}")
 
-    location_table[key]["id"] = count
+    location["id"] = count
 
-    if "region" not in location_table[key]:
-        location_table[key]["region"] = "Manual" # all locations are in the same region for Manual
+    if "region" not in location:
+        location["region"] = "Manual" # all locations are in the same region for Manual
 
-    if isinstance(location_table[key].get("category", []), str):
-        location_table[key]["category"] = [location_table[key]["category"]]
+    if isinstance(location.get("category", []), str):
+        location["category"] = [location["category"]]
 
     count += 1
 
@@ -44,18 +52,20 @@ if not victory_names:
     victory_names.append("__Manual Game Complete__")
 
 location_id_to_name: dict[int, str] = {}
-location_name_to_location: dict[str, dict] = {}
 location_name_groups: dict[str, list[str]] = {}
 
-for item in location_table:
-    location_id_to_name[item["id"]] = item["name"]
-    location_name_to_location[item["name"]] = item
+for index, location in enumerate(location_table):
+    location_id_to_name[location["id"]] = location["name"]
 
-    for c in item.get("category", []):
+    for c in location.get("category", []):
         if c not in location_name_groups:
             location_name_groups[c] = []
-        location_name_groups[c].append(item["name"])
+        location_name_groups[c].append(location["name"])
+
+    location_table[index] = ManualLocationRecord(location)
 
+# Only the ids and groups are needed to register the world, this is built the first time it's used
+location_name_to_location: LazyLookup = LazyLookup(lambda: {location["name"]: location for location in location_table})
 
 # location_id_to_name[None] = "__Manual Game Complete__"
 location_name_to_id = {name: id for id, name in location_id_to_name.items()}
@@ -0,0 +1,67 @@
+from typing import NamedTuple
+
+from .Items import category_item_names
+from .Requires import RequiresNode, RequiresTree, parse_requires_tree
+
+
+class Placement(NamedTuple):
+    """What a location's place_item/place_item_category and dont_place_item/dont_place_item_category resolve to.\n
+    eligible_item_names are the item names that can be placed there, without duplicates or forbidden names."""
+    eligible_item_names: tuple[str, ...]
+    forbidden_item_names: frozenset[str]
+    place_messages: tuple[str, ...]
+    forbid_messages: tuple[str, ...]
+
+PLACEMENT_KEYS = ("place_item", "place_item_category", "dont_place_item", "dont_place_item_category")
+
+
+class CompiledWorld:
+    """The place/dont_place resolution and the parsing of structured requires trees, done once and shared by every player of this game.\n
+    Everything else, including compiling the access rules in set_rules, is still done for each player."""
+
+    def __init__(self):
+        self._placements: dict[tuple[tuple[str, ...], ...], Placement] = {}
+        self._requires_trees: dict[int, tuple[RequiresTree, RequiresNode]] = {}
+
+    def get_placement(self, location: dict) -> Placement:
+        """Returns what location's place/dont_place keys resolve to, shared by every location with the same keys.\n
+        The keys are read from location each time, so hooks can still change them before generate_basic."""
+        key = tuple(tuple(location.get(placement_key) or ()) for placement_key in PLACEMENT_KEYS)
+        placement = self._placements.get(key)
+        if placement is None:
+            placement = self._placements[key] = self._resolve_placement(*key)
+        return placement
+
+    def _resolve_placement(self, place_item: tuple[str, ...], place_item_category: tuple[str, ...],
+                           dont_place_item: tuple[str, ...], dont_place_item_category: tuple[str, ...]) -> Placement:
+        eligible_item_names = list(place_item)
+        eligible_item_names += [name for category in place_item_category for name in category_item_names.get(category, ())]
+        forbidden_item_names = set(dont_place_item)
+        forbidden_item_names.update(name for category in dont_place_item_category for name in category_item_names.get(category, ()))
+
+        place_messages = []
+        if place_item:
+            place_messages.append('", "'.join(place_item))
+        if place_item_category:
+            place_messages.append('", "'.join(place_item_category) + " category(ies)")
+
+        forbid_messages = []
+        if dont_place_item:
+            forbid_messages.append('", "'.join(dont_place_item) + ' items')
+        if dont_place_item_category:
+            forbid_messages.append('", "'.join(dont_place_item_category) + ' category(ies)')
+
+        return Placement(tuple(name for name in dict.fromkeys(eligible_item_names) if name not in forbidden_item_names),
+                         frozenset(forbidden_item_names), tuple(place_messages), tuple(forbid_messages))
+
+    def parse_requires_tree(self, tree: RequiresTree) -> RequiresNode:
+        """parse_requires_tree, done once per requires tree instead of once per player.\n
+        Raises RequiresSyntaxError like parse_requires_tree."""
+        cached = self._requires_trees.get(id(tree))
+        # the tree is kept with its node, so a new tree reusing the id of one that was freed isn't mistaken for it
+        if cached is None or cached[0] is not tree:
+            cached = self._requires_trees[id(tree)] = (tree, parse_requires_tree(tree))
+        return cached[1]
+
+
+compiled_world = CompiledWorld()
@@ -1,14 +1,11 @@
+from importlib import resources
+import hashlib
+import json
 import logging
 
 from .DataValidation import DataValidation, ValidationError
 from .Helpers import load_data_file as helpers_load_data_file
 
-from .hooks.Data import \
-    after_load_game_file, \
-    after_load_item_file, after_load_location_file, \
-    after_load_region_file, after_load_category_file, \
-    after_load_option_file, after_load_meta_file
-
 # blatantly copied from the minecraft ap world because why not
 def load_data_file(*args) -> dict:
     logging.warning("Deprecated usage of importing load_data_file from Data.py uses the one from Helper.py instead")
@@ -36,26 +33,102 @@ class ManualFile:
         return contents
 
 
-game_table = ManualFile('game.json', dict).load() #dict
-item_table = convert_to_list(ManualFile('items.json', list).load(), 'data') #list
-location_table = convert_to_list(ManualFile('locations.json', list).load(), 'data') #list
-region_table = ManualFile('regions.json', dict).load() #dict
-category_table = ManualFile('categories.json', dict).load() #dict
-option_table = ManualFile('options.json', dict).load() #dict
-meta_table = ManualFile('meta.json', dict).load() #dict
-
-# Removal of schemas in root of tables
-region_table.pop('$schema', '')
-category_table.pop('$schema', '')
-
-# hooks
-game_table = after_load_game_file(game_table)
-item_table = after_load_item_file(item_table)
-location_table = after_load_location_file(location_table)
-region_table = after_load_region_file(region_table)
-category_table = after_load_category_file(category_table)
-option_table = after_load_option_file(option_table)
-meta_table = after_load_meta_file(meta_table)
+######################
+# Data snapshot
+######################
+
+# scripts/build.py saves the tables as they are after every hook here, so loading the apworld doesn't need to run the hooks (and the spec) again
+DATA_SNAPSHOT_FILE = 'snapshot.json'
+DATA_SNAPSHOT_TABLES = ['game_table', 'item_table', 'location_table', 'region_table', 'category_table', 'option_table', 'meta_table']
+# everything the tables are built from, relative to this apworld's folder
+DATA_SOURCES = ['Data.py', 'data', 'hooks', 'spec']
+
+def get_data_source_hash() -> str:
+    """Returns a hash of every file the tables are built from, the snapshot is only used if it was made from the exact same files."""
+    source_hash = hashlib.sha256()
+    package = resources.files(__package__)
+
+    def list_source_files(entry, path: str) -> list[tuple[str, object]]:
+        if entry.is_dir():
+            if entry.name == '__pycache__':
+                return []
+            return [file for child in entry.iterdir() for file in list_source_files(child, f"{path}/{child.name}")]
+        if path == f"data/{DATA_SNAPSHOT_FILE}":
+            return []
+        return [(path, entry)]
+
+    for path, entry in sorted(file for source in package.iterdir() if source.name in DATA_SOURCES for file in list_source_files(source, source.name)):
+        source_hash.update(path.encode())
+        source_hash.update(entry.read_bytes())
+    return source_hash.hexdigest()
+
+def write_data_snapshot(path: str) -> bool:
+    """Saves the tables loaded by this module to path, to be shipped as data/snapshot.json.\n
+    Needs to be called before anything else (eg. Items.py) changes the tables. Returns False if the tables can't be stored as JSON as-is."""
+    snapshot = {table_name: globals()[table_name] for table_name in DATA_SNAPSHOT_TABLES}
+    try:
+        if json.loads(json.dumps(snapshot)) != snapshot:
+            return False
+    except (TypeError, ValueError):
+        return False
+
+    snapshot['source_hash'] = get_data_source_hash()
+    with open(path, 'w', encoding='utf-8') as f:
+        # no indentation and no escaped non-ascii characters, the snapshot is shipped in every apworld
+        json.dump(snapshot, f, separators=(',', ':'), ensure_ascii=False)
+    return True
+
+def load_data_snapshot() -> dict | None:
+    snapshot = helpers_load_data_file(DATA_SNAPSHOT_FILE)
+    if not isinstance(snapshot, dict) or not all(table_name in snapshot for table_name in DATA_SNAPSHOT_TABLES):
+        return None
+
+    try:
+        if snapshot.get('source_hash') != get_data_source_hash():
+            logging.info(f"{DATA_SNAPSHOT_FILE} is out of date, loading the data files instead")
+            return None
+    except (OSError, TypeError):
+        return None
+    return snapshot
+
+
+data_snapshot = load_data_snapshot()
+
+if data_snapshot:
+    game_table = data_snapshot['game_table'] #dict
+    item_table = data_snapshot['item_table'] #list
+    location_table = data_snapshot['location_table'] #list
+    region_table = data_snapshot['region_table'] #dict
+    category_table = data_snapshot['category_table'] #dict
+    option_table = data_snapshot['option_table'] #dict
+    meta_table = data_snapshot['meta_table'] #dict
+else:
+    from .hooks.Data import \
+        after_load_game_file, \
+        after_load_item_file, after_load_location_file, \
+        after_load_region_file, after_load_category_file, \
+        after_load_option_file, after_load_meta_file
+
+    game_table = ManualFile('game.json', dict).load() #dict
+    item_table = convert_to_list(ManualFile('items.json', list).load(), 'data') #list
+    location_table = convert_to_list(ManualFile('locations.json', list).load(), 'data') #list
+    region_table = ManualFile('regions.json', dict).load() #dict
+    category_table = ManualFile('categories.json', dict).load() #dict
+    option_table = ManualFile('options.json', dict).load() #dict
+    meta_table = ManualFile('meta.json', dict).load() #dict
+
+    # Removal of schemas in root of tables
+    region_table.pop('$schema', '')
+    category_table.pop('$schema', '')
+
+    # hooks
+    game_table = after_load_game_file(game_table)
+    item_table = after_load_item_file(item_table)
+    location_table = after_load_location_file(location_table)
+    region_table = after_load_region_file(region_table)
+    category_table = after_load_category_file(category_table)
+    option_table = after_load_option_file(option_table)
+    meta_table = after_load_meta_file(meta_table)
 
 # seed all of the tables for validation
 DataValidation.game_table = game_table
@@ -4,6 +4,8 @@ import json
 from worlds.AutoWorld import World
 from BaseClasses import MultiWorld, ItemClassification
 
+from .Requires import escape_requires_name, iter_requires_items, split_requires_item, requires_tree_to_string
+
 
 class ValidationError(Exception):
     pass
@@ -21,21 +23,20 @@ class DataValidation():
             if "requires" not in location:
                 continue
 
-            if isinstance(location["requires"], str):
+            requires = location["requires"]
+            if isinstance(requires, dict): # structured requires from a spec
+                requires = requires_tree_to_string(requires)
+
+            if isinstance(requires, str):
                 # parse user written statement into list of each item
-                for item in re.findall(r'\|[^|]+\|', location["requires"]):
+                for item in iter_requires_items(requires):
                     if item.lower() == "or" or item.lower() == "and" or item == ")" or item == "(":
                         continue
                     else:
-                        # if it's a category, validate that the category exists
-                        if '@' in item:
-                            item = item.replace("|", "")
-                            item_parts = item.split(":")
-                            item_name = item
-
-                            if len(item_parts) > 1:
-                                item_name = item_parts[0]
+                        item_name, _ = split_requires_item(item)
 
+                        # if it's a category, validate that the category exists
+                        if item_name.startswith('@'):
                             item_name = item_name[1:]
                             item_category_exists = len([item for item in DataValidation.item_table if item_name in item.get('category', [])]) > 0
 
@@ -44,14 +45,6 @@ class DataValidation():
 
                             continue
 
-                        item = item.replace("|", "")
-
-                        item_parts = item.split(":")
-                        item_name = item
-
-                        if len(item_parts) > 1:
-                            item_name = item_parts[0]
-
                         item_exists = len([item["name"] for item in DataValidation.item_table if item["name"] == item_name]) > 0
 
                         if not item_exists:
@@ -67,22 +60,14 @@ class DataValidation():
                             or_items = item["or"]
 
                         for or_item in or_items:
-                            or_item_parts = or_item.split(":")
-                            or_item_name = or_item
-
-                            if len(or_item_parts) > 1:
-                                or_item_name = or_item_parts[0]
+                            or_item_name, _ = split_requires_item(or_item)
 
                             item_exists = len([item["name"] for item in DataValidation.item_table if item["name"] == or_item_name]) > 0
 
                             if not item_exists:
                                 raise ValidationError("Item %s is required by location %s but is misspelled or does not exist." % (or_item_name, location["name"]))
                     else:
-                        item_parts = item.split(":")
-                        item_name = item
-
-                        if len(item_parts) > 1:
-                            item_name = item_parts[0]
+                        item_name, _ = split_requires_item(item)
 
                         item_exists = len([item["name"] for item in DataValidation.item_table if item["name"] == item_name]) > 0
 
@@ -97,21 +82,20 @@ class DataValidation():
             if "requires" not in region:
                 continue
 
-            if isinstance(region["requires"], str):
+            requires = region["requires"]
+            if isinstance(requires, dict): # structured requires from a spec
+                requires = requires_tree_to_string(requires)
+
+            if isinstance(requires, str):
                 # parse user written statement into list of each item
-                for item in re.findall(r'\|[^|]+\|', region["requires"]):
+                for item in iter_requires_items(requires):
                     if item.lower() == "or" or item.lower() == "and" or item == ")" or item == "(":
                         continue
                     else:
-                        # if it's a category, validate that the category exists
-                        if '@' in item:
-                            item = item.replace("|", "")
-                            item_parts = item.split(":")
-                            item_name = item
-
-                            if len(item_parts) > 1:
-                                item_name = item_parts[0]
+                        item_name, _ = split_requires_item(item)
 
+                        # if it's a category, validate that the category exists
+                        if item_name.startswith('@'):
                             item_name = item_name[1:]
                             item_category_exists = len([item for item in DataValidation.item_table if item_name in item.get('category', [])]) > 0
 
@@ -120,14 +104,6 @@ class DataValidation():
 
                             continue
 
-                        item = item.replace("|", "")
-
-                        item_parts = item.split(":")
-                        item_name = item
-
-                        if len(item_parts) > 1:
-                            item_name = item_parts[0]
-
                         item_exists = len([item["name"] for item in DataValidation.item_table if item["name"] == item_name]) > 0
 
                         if not item_exists:
@@ -143,22 +119,14 @@ class DataValidation():
                             or_items = item["or"]
 
                         for or_item in or_items:
-                            or_item_parts = or_item.split(":")
-                            or_item_name = or_item
-
-                            if len(or_item_parts) > 1:
-                                or_item_name = or_item_parts[0]
+                            or_item_name, _ = split_requires_item(or_item)
 
                             item_exists = len([item["name"] for item in DataValidation.item_table if item["name"] == or_item_name]) > 0
 
                             if not item_exists:
                                 raise ValidationError("Item %s is required by region %s but is misspelled or does not exist." % (or_item_name, region_name))
                     else:
-                        item_parts = item.split(":")
-                        item_name = item
-
-                        if len(item_parts) > 1:
-                            item_name = item_parts[0]
+                        item_name, _ = split_requires_item(item)
 
                         item_exists = len([item["name"] for item in DataValidation.item_table if item["name"] == item_name]) > 0
 
@@ -193,11 +161,14 @@ class DataValidation():
                     continue
 
                 # convert to json so we don't have to guess the data type
-                location_requires = json.dumps(location["requires"])
+                location_requires = location["requires"]
+                if isinstance(location_requires, dict):
+                    location_requires = requires_tree_to_string(location_requires)
+                location_requires = json.dumps(location_requires)
 
                 # if boolean, else legacy
                 if isinstance(location_requires, str):
-                    if '|{}|'.format(item["name"]) in location_requires:
+                    if '|{}|'.format(json.dumps(escape_requires_name(item["name"]))[1:-1]) in location_requires:
                         raise ValidationError("Item %s is required by location %s, but the item is not marked as progression." % (item["name"], location["name"]))
                 else:
                     if item["name"] in location_requires:
@@ -211,11 +182,14 @@ class DataValidation():
                     continue
 
                 # convert to json so we don't have to guess the data type
-                region_requires = json.dumps(region["requires"])
+                region_requires = region["requires"]
+                if isinstance(region_requires, dict):
+                    region_requires = requires_tree_to_string(region_requires)
+                region_requires = json.dumps(region_requires)
 
                 # if boolean, else legacy
                 if isinstance(region_requires, str):
-                    if '|{}|'.format(item["name"]) in region_requires:
+                    if '|{}|'.format(json.dumps(escape_requires_name(item["name"]))[1:-1]) in region_requires:
                         raise ValidationError("Item %s is required by region %s, but the item is not marked as progression." % (item["name"], region_name))
                 else:
                     if item["name"] in region_requires:
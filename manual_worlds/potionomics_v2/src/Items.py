@@ -1,6 +1,14 @@
 from BaseClasses import Item
 from .Data import item_table
 from .Game import filler_item_name, starting_index
+from .Helpers import LazyLookup, ManualRecord, format_state_prog_items_key, format_category_prog_items_key, ProgItemsCat
+
+
+class ManualItemRecord(ManualRecord):
+    """An item of item_table, read and written like a dict but stored in slots"""
+    __slots__ = ("name", "id", "category", "count", "value", "progression", "progression_skip_balancing",
+                 "useful", "trap", "filler", "early", "local", "local_early")
+    fields = frozenset(__slots__)
 
 
 ######################
@@ -37,10 +45,9 @@ for key, val in enumerate(item_table):
         
     count += 1
 
-for item in item_table:
+for index, item in enumerate(item_table):
     item_name = item["name"]
     item_id_to_name[item["id"]] = item_name
-    item_name_to_item[item_name] = item
 
     if item["id"] is not None:
         lastItemId = max(lastItemId, item["id"])
@@ -60,6 +67,34 @@ for item in item_table:
             item_name_groups[group_name] = []
         item_name_groups[group_name].append(item_name)
 
+    item_table[index] = item_name_to_item[item_name] = ManualItemRecord(item)
+
+# Every item name of each category, looked up instead of scanning item_name_to_item for "all items in category X"
+# Only needed during generation, so it's built the first time it's used
+def build_category_item_names() -> dict[str, tuple[str, ...]]:
+    category_items: dict[str, list[str]] = {}
+    for item in item_table:
+        for c in dict.fromkeys(item.get("category", [])):
+            category_items.setdefault(c, []).append(item["name"])
+    return {c: tuple(names) for c, names in category_items.items()}
+
+category_item_names: LazyLookup = LazyLookup(build_category_item_names)
+
+# What collecting one of each item adds to state.prog_items besides the item itself: its values and its categories' counts
+# Computed once here so collect/remove don't format the keys again for every item of every sweep
+def get_item_prog_items_deltas(item: dict) -> tuple[tuple[str, int], ...]:
+    """Returns the prog_items keys and amounts that collecting item adds to."""
+    deltas = [(format_state_prog_items_key(ProgItemsCat.VALUE, key), int(value)) for key, value in item.get("value", {}).items()]
+    # an item listing a category twice still only counts once for it
+    deltas.extend((format_category_prog_items_key(category), 1) for category in dict.fromkeys(item.get("category", [])))
+    return tuple(deltas)
+
+item_prog_items_deltas: dict[str, tuple[tuple[str, int], ...]] = {}
+for item in item_table:
+    deltas = get_item_prog_items_deltas(item)
+    if deltas:
+        item_prog_items_deltas[item["name"]] = deltas
+
 item_id_to_name[None] = "__Victory__"
 item_name_to_id = {name: id for id, name in item_id_to_name.items()}
 
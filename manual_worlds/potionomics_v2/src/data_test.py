@@ -0,0 +1,64 @@
+from unittest import TestCase
+
+from .Items import ManualItemRecord, item_table, item_prog_items_deltas, get_item_prog_items_deltas
+from .Locations import ManualLocationRecord, location_table
+
+
+class TestManualRecords(TestCase):
+    """Hooks edit the items/locations of the tables in place, the records have to keep allowing it"""
+
+    def test_category_append(self):
+        categories = ["Tools"]
+        item = ManualItemRecord({"name": "Hammer", "category": categories})
+        item["category"].append("Weapons")
+        self.assertIs(item["category"], categories)
+        self.assertEqual(item["category"], ["Tools", "Weapons"])
+
+        location = ManualLocationRecord({"name": "Shed", "category": ["Outside"]})
+        location["category"].append("(Hinted)")
+        self.assertEqual(location["category"], ["Outside", "(Hinted)"])
+
+    def test_missing_category_added(self):
+        location = ManualLocationRecord({"name": "Shed"})
+        location["category"] = location.get("category", [])
+        location["category"].append("(Hinted)")
+        self.assertEqual(location["category"], ["(Hinted)"])
+
+    def test_value_edit(self):
+        item = ManualItemRecord({"name": "Coin", "value": {}})
+        item["value"]["coins"] = 1
+        self.assertEqual(item["value"], {"coins": 1})
+        self.assertEqual(ManualItemRecord({"name": "Other Coin", "value": {}})["value"], {})
+
+    def test_extra_keys(self):
+        location = ManualLocationRecord({"name": "Shed", "region": "Manual"})
+        location["custom"] = ["a"]
+        location["custom"].append("b")
+        self.assertEqual(location, {"name": "Shed", "region": "Manual", "custom": ["a", "b"]})
+        del location["custom"]
+        self.assertNotIn("custom", location)
+        self.assertEqual(ManualLocationRecord({"name": "Other Shed"}), {"name": "Other Shed"})
+
+    def test_tables_are_editable(self):
+        for item in item_table:
+            self.assertIsInstance(item["value"], dict, item["name"])
+            self.assertIsInstance(item.get("category", []), list, item["name"])
+        for location in location_table:
+            self.assertIsInstance(location.get("category", []), list, location["name"])
+
+
+class TestItemProgItemsDeltas(TestCase):
+    def test_category_listed_twice(self):
+        deltas = get_item_prog_items_deltas({"name": "Hammer", "value": {"Coins": 2}, "category": ["Tools", "Tools", "Weapons"]})
+        self.assertEqual(deltas, (("MANUAL_VALUE_coins", 2), ("MANUAL_CATEGORY_Tools", 1), ("MANUAL_CATEGORY_Weapons", 1)))
+
+    def test_similar_category_names(self):
+        hammer = get_item_prog_items_deltas({"name": "Hammer", "category": ["Big Tools"]})
+        drill = get_item_prog_items_deltas({"name": "Drill", "category": ["Big_Tools"]})
+        saw = get_item_prog_items_deltas({"name": "Saw", "category": ["big tools"]})
+        self.assertEqual(len({hammer, drill, saw}), 3)
+
+    def test_table_deltas(self):
+        for item in item_table:
+            keys = [key for key, _ in item_prog_items_deltas.get(item["name"], ())]
+            self.assertEqual(len(keys), len(set(keys)), item["name"])
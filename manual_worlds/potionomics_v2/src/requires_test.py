@@ -0,0 +1,136 @@
+from collections import Counter
+from unittest import TestCase
+
+from .Requires import LogicErrorSource, RequiresSyntaxError, escape_requires_name, parse_requires, parse_requires_tree, resolve_relative_amounts, \
+    simplify_requires, split_requires_item, AndNode, CategoryNode, ConstantNode, FunctionNode, ItemNode, NotNode, OrNode, TemplateNode
+from .Rules import OptAll, OptOne
+
+
+A, B, C = ItemNode("A"), ItemNode("B"), ItemNode("C")
+
+
+class TestParseRequires(TestCase):
+    def test_items_and_categories(self):
+        self.assertEqual(parse_requires("|A|"), A)
+        self.assertEqual(parse_requires("|A:3|"), ItemNode("A", 3))
+        self.assertEqual(parse_requires("|@Tools:2|"), CategoryNode("Tools", 2))
+        self.assertEqual(parse_requires(""), ConstantNode(True))
+
+    def test_relative_amounts(self):
+        self.assertEqual(parse_requires("|A:ALL|"), ItemNode("A", "all"))
+        self.assertEqual(parse_requires("|@Tools:half|"), CategoryNode("Tools", "half"))
+        self.assertEqual(parse_requires("|A:50%|"), ItemNode("A", "50%"))
+
+    def test_left_to_right(self):
+        # AND and OR have the same precedence
+        self.assertEqual(parse_requires("|A| or |B| and |C|"), AndNode((OrNode((A, B)), C)))
+        self.assertEqual(parse_requires("|A| and |B| or |C|"), OrNode((AndNode((A, B)), C)))
+        self.assertEqual(parse_requires("|A| AND |B| and |C|"), AndNode((A, B, C)))
+
+    def test_parentheses(self):
+        self.assertEqual(parse_requires("|A| or (|B| and |C|)"), OrNode((A, AndNode((B, C)))))
+        # a missing closing parenthesis at the end is tolerated
+        self.assertEqual(parse_requires("|A| and (|B| or |C|"), AndNode((A, OrNode((B, C)))))
+
+    def test_not(self):
+        self.assertEqual(parse_requires("!|A| and |B|"), AndNode((NotNode(A), B)))
+        self.assertEqual(parse_requires("!(|A| or |B|)"), NotNode(OrNode((A, B))))
+
+    def test_functions_and_constants(self):
+        self.assertEqual(parse_requires("{YamlEnabled(opt)} or 0"), OrNode((FunctionNode("YamlEnabled", "opt"), ConstantNode(False))))
+        self.assertEqual(parse_requires("{canReachLocation(Re\\:Start)}"), FunctionNode("canReachLocation", "Re\\:Start"))
+
+    def test_templates(self):
+        requires = "|Coin:{CoinCount()}| and |A|"
+        self.assertEqual(parse_requires(requires), TemplateNode(requires))
+
+    def test_escapes(self):
+        self.assertEqual(parse_requires("|Re\\:Start:2|"), ItemNode("Re:Start", 2))
+        self.assertEqual(parse_requires("|Pipe\\|Item| and |@Re\\:Set|"), AndNode((ItemNode("Pipe|Item"), CategoryNode("Re:Set"))))
+        self.assertEqual(parse_requires("|Back\\\\slash|"), ItemNode("Back\\slash"))
+
+    def test_escape_round_trip(self):
+        for name in ("Re:Start", "Pipe|Item", "Back\\slash", "Plain"):
+            self.assertEqual(split_requires_item(escape_requires_name(name) + ":2"), (name, "2"))
+            self.assertEqual(parse_requires(f"|{escape_requires_name(name)}|"), ItemNode(name))
+
+    def test_syntax_errors(self):
+        for requires, source in (("|A:lots|", LogicErrorSource.INVALID_ITEM_COUNT), ("|A| and", LogicErrorSource.EVALUATE_POSTFIX),
+                                 ("|A| and |B", LogicErrorSource.EVALUATE_POSTFIX), ("|A|)", LogicErrorSource.INFIX_TO_POSTFIX),
+                                 ("(|A|) |B|", LogicErrorSource.EVALUATE_STACK_SIZE)):
+            with self.assertRaises(RequiresSyntaxError, msg=requires) as context:
+                parse_requires(requires)
+            self.assertEqual(context.exception.source, source, requires)
+
+    def test_tree(self):
+        tree = {"all_of": [{"item": "A"}, {"any_of": [{"category": "Tools", "amount": "half"}, "|B:2|"]}]}
+        self.assertEqual(parse_requires_tree(tree), AndNode((A, OrNode((CategoryNode("Tools", "half"), ItemNode("B", 2))))))
+
+
+class TestSimplifyRequires(TestCase):
+    def test_constants(self):
+        self.assertEqual(simplify_requires(parse_requires("|A| or 1")), ConstantNode(True))
+        self.assertEqual(simplify_requires(parse_requires("|A| and 1")), A)
+        self.assertEqual(simplify_requires(parse_requires("|A| and 0 or |B|")), B)
+        self.assertEqual(simplify_requires(parse_requires("|A| and (0 or |B|) and |C|")), AndNode((A, B, C)))
+
+    def test_not(self):
+        self.assertEqual(simplify_requires(parse_requires("!0")), ConstantNode(True))
+        self.assertEqual(simplify_requires(parse_requires("!(|A| and 1)")), NotNode(A))
+
+    def test_unchanged(self):
+        node = parse_requires("|A| or (|B| and {YamlEnabled(opt)})")
+        self.assertEqual(simplify_requires(node), node)
+
+
+class TestResolveRelativeAmounts(TestCase):
+    totals = {"A": 4, "Tools": 5}
+
+    def get_total(self, node):
+        return self.totals[node.name]
+
+    def test_amounts(self):
+        node = parse_requires("|A:all| and !|@Tools:50%| or |A:half|")
+        self.assertEqual(resolve_relative_amounts(node, self.get_total),
+                         OrNode((AndNode((ItemNode("A", 4), NotNode(CategoryNode("Tools", 3)))), ItemNode("A", 2))))
+
+    def test_percent_is_clamped(self):
+        self.assertEqual(resolve_relative_amounts(parse_requires("|A:150%|"), self.get_total), ItemNode("A", 4))
+        self.assertEqual(resolve_relative_amounts(parse_requires("|A:-5%|"), self.get_total), ItemNode("A", 0))
+
+    def test_absolute_amounts_unchanged(self):
+        def get_total(node):
+            raise AssertionError(f"{node} has an absolute amount")
+
+        node = parse_requires("|A:2| and (|@Tools| or {YamlEnabled(opt)})")
+        self.assertEqual(resolve_relative_amounts(node, get_total), node)
+
+
+class OptWorld:
+    """Just what OptOne/OptAll read from the world"""
+    category_item_names = {"Re:Set": ("Re:Start", "Pipe|Item")}
+
+    def get_item_counts(self, player=None, pool=None, only_progression=False) -> Counter:
+        return Counter({"Re:Start": 1, "Pipe|Item": 3, "Sword": 2})
+
+
+class TestOptFunctions(TestCase):
+    def test_escaped_colon_keeps_count(self):
+        self.assertEqual(OptOne(OptWorld(), "|Re\\:Start:2|"), "|Re\\:Start:1|")
+        self.assertEqual(OptOne(OptWorld(), "Re\\:Start"), "|Re\\:Start:1|")
+
+    def test_escaped_pipe(self):
+        self.assertEqual(OptOne(OptWorld(), "|Pipe\\|Item:2|"), "|Pipe\\|Item:2|")
+
+    def test_escaped_category(self):
+        self.assertEqual(OptOne(OptWorld(), "|@Re\\:Set:10|"), "|@Re\\:Set:4|")
+
+    def test_non_numeric_count_is_kept(self):
+        self.assertEqual(OptOne(OptWorld(), "|Re\\:Start:all|"), "|Re\\:Start:all|")
+
+    def test_opt_all_escaped_names(self):
+        self.assertEqual(OptAll(OptWorld(), "|Re\\:Start:2| and (|Pipe\\|Item:5| or |Sword|)"),
+                         "|Re\\:Start:1| and (|Pipe\\|Item:3| or |Sword:1|)")
+
+    def test_opt_all_keeps_functions(self):
+        self.assertEqual(OptAll(OptWorld(), "|Sword:3| and {YamlEnabled(opt)}"), "|Sword:2| and {YamlEnabled(opt)}")
@@ -1,37 +1,41 @@
-from typing import Literal
+from typing import Any, Literal
 from .types import CategoryData, ItemData
 
 
 class Requires:
+    """Builds requires as structured data ({"item": ...}, {"all_of": [...]}, ...),
+    which Rules.py compiles directly instead of parsing a requires string."""
+
     type Amount = int | str | Literal["all"] | Literal["half"]
+    type Tree = dict[str, Any]
 
     @staticmethod
-    def item(item_specifier: str | ItemData, amount: Amount | None = None) -> str:
+    def item(item_specifier: str | ItemData, amount: Amount | None = None) -> Tree:
         item_name = (
             item_specifier
             if isinstance(item_specifier, str)
             else item_specifier["name"]
         )
-        result = f"|{item_name}"
+        result: Requires.Tree = {"item": item_name}
 
         if amount != None:
-            result += f":{amount}"
+            result["amount"] = amount
 
-        return result + "|"
+        return result
 
     @staticmethod
-    def category(category_name: str, amount: Amount | None = None) -> str:
-        result = f"|@{category_name}"
+    def category(category_name: str, amount: Amount | None = None) -> Tree:
+        result: Requires.Tree = {"category": category_name}
 
         if amount != None:
-            result += f":{amount}"
+            result["amount"] = amount
 
-        return result + "|"
+        return result
 
     @staticmethod
-    def all_of(*specifiers: str) -> str:
-        return "(" + " and ".join(specifiers) + ")"
+    def all_of(*specifiers: Tree | str) -> Tree:
+        return {"all_of": [*specifiers]}
 
     @staticmethod
-    def any_of(*specifiers: str) -> str:
-        return "(" + " or ".join(specifiers) + ")"
+    def any_of(*specifiers: Tree | str) -> Tree:
+        return {"any_of": [*specifiers]}
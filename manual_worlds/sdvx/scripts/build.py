@@ -42,6 +42,17 @@ with TemporaryDirectory() as temp_archive_root:
         dst=Path(temp_archive_root) / apworld_base_name,
     )
 
+    # ship the tables loaded above so Data.py doesn't need to build them from songs.json on every import
+    if not data_module.write_data_snapshot(
+        str(
+            Path(temp_archive_root)
+            / apworld_base_name
+            / "data"
+            / data_module.DATA_SNAPSHOT_FILE
+        )
+    ):
+        raise Exception("Failed to write the data snapshot, the tables can't be stored as JSON")
+
     apworld_zip = shutil.make_archive(
         base_name=apworld_base_name,
         format="zip",
@@ -1,20 +1,14 @@
 # Object classes from AP core, to represent an entire MultiWorld and this individual World that's part of it
 from math import floor
-from typing import cast
+from typing import TYPE_CHECKING, cast
 from worlds.AutoWorld import World
 from BaseClasses import MultiWorld, CollectionState, Item
 
 # Object classes from Manual -- extending AP core -- representing items and locations that are used in generation
 from ..Items import ManualItem
-from ..spec import (
-    SongSpec,
-    song_specs,
-    song_specs_by_item_name,
-    inclusion_brackets,
-    rank_locations,
-    score_helpers,
-    filler_score_helper,
-)
+# The spec is imported by the hooks that need it, so loading the apworld from the data snapshot doesn't build it
+if TYPE_CHECKING:
+    from ..spec import SongSpec
 
 # Raw JSON data from the Manual apworld, respectively:
 #          data/game.json, data/items.json, data/locations.json, data/regions.json
@@ -25,7 +19,7 @@ from ..Helpers import get_option_value, is_option_enabled
 
 # calling logging.info("message") anywhere below in this file will output the message to both console and log file
 
-excluded_songs_by_player = dict[int, list[SongSpec]]()
+excluded_songs_by_player = dict[int, list["SongSpec"]]()
 
 ########################################################################################
 ## Order of method calls when the world generates:
@@ -43,11 +37,14 @@ excluded_songs_by_player = dict[int, list[SongSpec]]()
 # Use this function to change the valid filler items to be created to replace item links or starting items.
 # Default value is the `filler_item_name` from game.json
 def hook_get_filler_item_name(world: World, multiworld: MultiWorld, player: int) -> str | bool:
+    from ..spec import filler_score_helper
+
     return filler_score_helper.item["name"]
 
 
 # Called before regions and locations are created. Not clear why you'd want this, but it's here. Victory location is included, but Victory event is not placed yet.
 def before_create_regions(world: World, multiworld: MultiWorld, player: int):
+    from ..spec import SongSpec, song_specs, song_specs_by_item_name, inclusion_brackets
     from .state import disabled_categories_by_player_id
 
     songs_by_level: dict[int, list[SongSpec]] = {}
@@ -140,6 +137,8 @@ def after_create_regions(world: World, multiworld: MultiWorld, player: int):
 #       will create 5 items that are the "useful trap" class
 # {"Item Name": {ItemClassification.useful: 5}} <- You can also use the classification directly
 def before_create_items_all(item_config: dict[str, int|dict], world: World, multiworld: MultiWorld, player: int) -> dict[str, int|dict]:
+    from ..spec import inclusion_brackets, rank_locations, score_helpers
+
     included_song_count = sum(
         cast(int, get_option_value(multiworld, player, bracket.option_name))
         for bracket in inclusion_brackets
@@ -200,15 +200,10 @@ for song in all_songs:
         )
     )
 
-    # category requires are expensive for playthrough calculation,
-    # so only use them if necessary, such as if the song name
-    # would break the require string because sdvx artists
-    # can't use normal song titles fkldsjfl
-    song_requires = (
-        f"|{song_item_name}|"
-        if all(char not in song_item_name for char in ":|")
-        else f"|@{song_spec.id_category_name}|"
-    )
+    # structured requires skip the string parsing entirely,
+    # which also means sdvx artists' song titles with : or | in them
+    # can't break anything fkldsjfl
+    song_requires = {"item": song_item_name}
 
     song_spec.locations.append(
         world_spec.define_location(
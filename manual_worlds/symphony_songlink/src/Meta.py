@@ -1,4 +1,6 @@
 
+import os
+
 from BaseClasses import Tutorial
 from worlds.AutoWorld import World, WebWorld
 from .Data import meta_table
@@ -72,3 +74,5 @@ world_description: str = set_world_description("""
 world_webworld: ManualWeb = set_world_webworld(ManualWeb())
 
 enable_region_diagram = bool(meta_table.get("enable_region_diagram", False))
+enable_stage_profiler = bool(meta_table.get("enable_stage_profiler", False)) or bool(os.environ.get("MANUAL_PROFILE_STAGES"))
+enable_stage_memory_profiler = bool(meta_table.get("enable_stage_memory_profiler", False)) or bool(os.environ.get("MANUAL_PROFILE_STAGE_MEMORY"))
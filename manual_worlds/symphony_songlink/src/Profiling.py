@@ -0,0 +1,113 @@
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+
+class StageProfiler:
+    """Records the wall time of every ManualWorld stage and world hook of a player, as Chrome trace events.
+    \nEnable it with "enable_stage_profiler" in meta.json or by setting the MANUAL_PROFILE_STAGES environment variable,
+    then open the written _stages.json file in chrome://tracing or https://ui.perfetto.dev to see where a generation spends its time.
+    \nWith track_memory ("enable_stage_memory_profiler" or MANUAL_PROFILE_STAGE_MEMORY) the memory allocated by every stage is recorded too.
+    This slows the whole generation down, so tracemalloc is only running from the first profiler's creation until every profiler
+    has reached generate_output, and the later stages only get their time recorded.
+    Memory is traced for the whole process, so stages of different players running at the same time (generate_output) count each other's allocations."""
+
+    _memory_lock = threading.Lock()
+    _memory_trackers = 0
+    _started_tracemalloc = False
+
+    def __init__(self, game: str, player: int, player_name: str, track_memory: bool = False):
+        self.output_path: Optional[str] = None
+        self.events: list[dict] = [
+            {"name": "process_name", "ph": "M", "pid": os.getpid(), "args": {"name": "Archipelago"}},
+            {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": player, "args": {"name": f"{game} ({player_name})"}},
+        ]
+        self.player = player
+        self.lock = threading.Lock()
+        self.tracking_memory = False
+        if track_memory:
+            with StageProfiler._memory_lock:
+                if not StageProfiler._memory_trackers and not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    StageProfiler._started_tracemalloc = True
+                StageProfiler._memory_trackers += 1
+            self.tracking_memory = True
+
+    def stop_tracking_memory(self):
+        """Stops recording memory for this player, and stops tracemalloc if this profiler's player was the last one using it."""
+        if not self.tracking_memory:
+            return
+        self.tracking_memory = False
+        with StageProfiler._memory_lock:
+            StageProfiler._memory_trackers -= 1
+            if not StageProfiler._memory_trackers and StageProfiler._started_tracemalloc:
+                tracemalloc.stop()
+                StageProfiler._started_tracemalloc = False
+
+    @contextmanager
+    def stage(self, name: str, category: str) -> Iterator[None]:
+        allocated_before = tracemalloc.get_traced_memory()[0] if self.tracking_memory else None
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter_ns() - start
+            args = {}
+            # another player's profiler may have stopped tracemalloc during this stage
+            if allocated_before is not None and tracemalloc.is_tracing():
+                args["allocated_kb"] = round((tracemalloc.get_traced_memory()[0] - allocated_before) / 1024, 1)
+            with self.lock:
+                self.events.append({
+                    "name": name, "cat": category, "ph": "X", "pid": os.getpid(), "tid": self.player,
+                    "ts": start / 1000, "dur": duration / 1000, "args": args
+                })
+
+    def write(self):
+        with self.lock, open(self.output_path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+
+
+def profile_stage(method: Callable) -> Callable:
+    """Decorates a ManualWorld stage so its time and memory are recorded when the stage profiler is enabled.
+    \nThe timeline is written again after every stage once generate_output has set where to write it,
+    memory stops being recorded at that point."""
+    @functools.wraps(method)
+    def profiledStage(world, *args, **kwargs):
+        if not world.stage_profiler:
+            return method(world, *args, **kwargs)
+
+        try:
+            with world.stage_profiler.stage(method.__name__, "manual"):
+                return method(world, *args, **kwargs)
+        finally:
+            if world.stage_profiler.output_path:
+                world.stage_profiler.stop_tracking_memory()
+                world.stage_profiler.write()
+
+    return profiledStage
+
+
+def profile_hook(hook: Callable) -> Callable:
+    """Wraps a hooks/World.py function so its time and memory are recorded when the stage profiler of the world it's called with is enabled."""
+    parameters = list(inspect.signature(hook).parameters)
+    if "world" not in parameters:
+        return hook
+    world_index = parameters.index("world")
+
+    @functools.wraps(hook)
+    def profiledHook(*args, **kwargs):
+        world = kwargs["world"] if "world" in kwargs else args[world_index]
+        stage_profiler = getattr(world, "stage_profiler", None)
+        if not stage_profiler:
+            return hook(*args, **kwargs)
+
+        with stage_profiler.stage(hook.__name__, "hook"):
+            return hook(*args, **kwargs)
+
+    return profiledHook
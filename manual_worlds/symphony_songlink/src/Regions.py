@@ -21,6 +21,13 @@ regionMap["Manual"] = {
 
 
 def create_regions(world: World, multiworld: MultiWorld, player: int):
+    # Group the enabled locations by region in one pass, instead of going through every location for each region
+    region_locations: dict[str, list[str]] = {}
+    for location in world.location_table:
+        if "region" in location and location["region"] in regionMap:
+            if is_location_enabled(multiworld, player, location):
+                region_locations.setdefault(location["region"], []).append(location["name"])
+
     # Create regions and assign locations to each region
     for region in regionMap:
         if "connects_to" not in regionMap[region]:
@@ -32,11 +39,7 @@ def create_regions(world: World, multiworld: MultiWorld, player: int):
         if not exit_array:
             exit_array = None
 
-        locations = []
-        for location in world.location_table:
-            if "region" in location and location["region"] == region:
-                if is_location_enabled(multiworld, player, location):
-                    locations.append(location["name"])
+        locations = region_locations.get(region, [])
 
         new_region = create_region(world, multiworld, player, region, locations, exit_array)
         multiworld.regions += [new_region]
@@ -1,4 +1,5 @@
 from base64 import b64encode
+from collections import Counter
 import logging
 import os
 import json
@@ -12,7 +13,8 @@ from worlds.LauncherComponents import Component, SuffixIdentifier, components, T
 
 from .Data import item_table, location_table, region_table, category_table, meta_table
 from .Game import game_name, filler_item_name, starting_items
-from .Meta import world_description, world_webworld, enable_region_diagram
+from .Meta import world_description, world_webworld, enable_region_diagram, enable_stage_profiler, enable_stage_memory_profiler
+from .Profiling import StageProfiler, profile_stage, profile_hook
 from .Locations import location_id_to_name, location_name_to_id, location_name_to_location, location_name_groups, victory_names
 from .Items import item_id_to_name, item_name_to_id, item_name_to_item, item_name_groups
 from .DataValidation import runGenerationDataValidation, runPreFillDataValidation
@@ -37,6 +39,16 @@ from .hooks.World import \
     before_extend_hint_information, after_extend_hint_information
 from .hooks.Data import hook_interpret_slot_data
 
+# The hooks called once per stage are timed by the stage profiler too, the ones called for every item (create_item) aren't
+before_create_regions, after_create_regions = profile_hook(before_create_regions), profile_hook(after_create_regions)
+before_create_items_starting, before_create_items_filler = profile_hook(before_create_items_starting), profile_hook(before_create_items_filler)
+after_create_items = profile_hook(after_create_items)
+before_set_rules, after_set_rules = profile_hook(before_set_rules), profile_hook(after_set_rules)
+before_generate_basic, after_generate_basic = profile_hook(before_generate_basic), profile_hook(after_generate_basic)
+before_fill_slot_data, after_fill_slot_data = profile_hook(before_fill_slot_data), profile_hook(after_fill_slot_data)
+before_write_spoiler = profile_hook(before_write_spoiler)
+before_extend_hint_information, after_extend_hint_information = profile_hook(before_extend_hint_information), profile_hook(after_extend_hint_information)
+
 class ManualWorld(World):
     __doc__ = world_description
     game: str = game_name
@@ -90,6 +102,12 @@ class ManualWorld(World):
         runGenerationDataValidation()
 
 
+    def generate_early(self) -> None:
+        # Enable this in Meta.json to get a timeline of the time (and with enable_stage_memory_profiler, memory) spent in every stage and hook of this world
+        if enable_stage_profiler:
+            self.stage_profiler = StageProfiler(self.game, self.player, self.multiworld.get_player_name(self.player), enable_stage_memory_profiler)
+
+    @profile_stage
     def create_regions(self):
         before_create_regions(self, self.multiworld, self.player)
 
@@ -106,6 +124,7 @@ class ManualWorld(World):
 
         after_create_regions(self, self.multiworld, self.player)
 
+    @profile_stage
     def create_items(self):
         # Generate item pool
         pool = []
@@ -170,21 +189,22 @@ class ManualWorld(World):
                 # if there's a condition on having a previous item, check for any of them
                 # if not found in items started, this starting item rule shouldn't execute, and check the next one
                 if "if_previous_item" in starting_item_block:
-                    matching_items = [item for item in items_started if item.name in starting_item_block["if_previous_item"]]
-
-                    if len(matching_items) == 0:
+                    previous_item_names = set(starting_item_block["if_previous_item"])
+                    if not any(item.name in previous_item_names for item in items_started):
                         continue
 
                 # start with the full pool of items
-                items = pool
+                items = list(pool)
 
                 # if the setting lists specific item names, limit the items to just those
                 if "items" in starting_item_block:
-                    items = [item for item in pool if item.name in starting_item_block["items"]]
+                    block_item_names = set(starting_item_block["items"])
+                    items = [item for item in pool if item.name in block_item_names]
 
                 # if the setting lists specific item categories, limit the items to ones that have any of those categories
                 if "item_categories" in starting_item_block:
-                    items_in_categories = [item["name"] for item in self.item_name_to_item.values() if "category" in item and len(set(starting_item_block["item_categories"]).intersection(item["category"])) > 0]
+                    block_categories = set(starting_item_block["item_categories"])
+                    items_in_categories = {item["name"] for item in self.item_name_to_item.values() if "category" in item and not block_categories.isdisjoint(item["category"])}
                     items = [item for item in pool if item.name in items_in_categories]
 
                 self.random.shuffle(items)
@@ -196,9 +216,12 @@ class ManualWorld(World):
                 for starting_item in items:
                     items_started.append(starting_item)
                     self.multiworld.push_precollected(starting_item)
-                    pool.remove(starting_item)
 
-        self.start_inventory = {i.name: items_started.count(i) for i in items_started}
+                # removed by identity in one pass, instead of one pool.remove (a scan of the pool) per item
+                started_ids = {id(item) for item in items}
+                pool = [item for item in pool if id(item) not in started_ids]
+
+        self.start_inventory = dict(Counter(item.name for item in items_started))
 
         pool = before_create_items_filler(pool, self, self.multiworld, self.player)
         pool = self.adjust_filler_items(pool, traps)
@@ -232,6 +255,7 @@ class ManualWorld(World):
 
         return item_object
 
+    @profile_stage
     def set_rules(self):
         before_set_rules(self, self.multiworld, self.player)
 
@@ -239,9 +263,19 @@ class ManualWorld(World):
 
         after_set_rules(self, self.multiworld, self.player)
 
+    @profile_stage
     def generate_basic(self):
         before_generate_basic(self, self.multiworld, self.player)
 
+        # each category's item names, so every location doesn't go through every item for its place/dont_place categories
+        category_item_names: dict[str, list[str]] = {}
+        for i in item_name_to_item.values():
+            for category in dict.fromkeys(i.get("category", [])):
+                category_item_names.setdefault(category, []).append(i["name"])
+
+        def get_category_item_names(categories: list[str]) -> list[str]:
+            return list(dict.fromkeys(name for category in categories for name in category_item_names.get(category, [])))
+
         # Handle item forbidding
         manual_locations_with_forbid = {location['name']: location for location in location_name_to_location.values() if "dont_place_item" in location or "dont_place_item_category" in location}
         locations_with_forbid = [l for l in self.multiworld.get_unfilled_locations(player=self.player) if l.name in manual_locations_with_forbid.keys()]
@@ -250,10 +284,10 @@ class ManualWorld(World):
             forbidden_item_names = []
 
             if manual_location.get("dont_place_item"):
-                forbidden_item_names.extend([i["name"] for i in item_name_to_item.values() if i["name"] in manual_location["dont_place_item"]])
+                forbidden_item_names.extend([name for name in manual_location["dont_place_item"] if name in item_name_to_item])
 
             if manual_location.get("dont_place_item_category"):
-                forbidden_item_names.extend([i["name"] for i in item_name_to_item.values() if "category" in i and set(i["category"]).intersection(manual_location["dont_place_item_category"])])
+                forbidden_item_names.extend(get_category_item_names(manual_location["dont_place_item_category"]))
 
             if forbidden_item_names:
                 forbid_items_for_player(location, set(forbidden_item_names), self.player)
@@ -261,9 +295,17 @@ class ManualWorld(World):
         # Handle specific item placements using fill_restrictive
         manual_locations_with_placements = {location['name']: location for location in location_name_to_location.values() if "place_item" in location or "place_item_category" in location}
         locations_with_placements = [l for l in self.multiworld.get_unfilled_locations(player=self.player) if l.name in manual_locations_with_placements.keys()]
+
+        # this player's items left in the pool by name, so each placement doesn't scan the whole multiworld's pool
+        pool_items_by_name: dict[str, list[Item]] = {}
+        if locations_with_placements:
+            for item in self.multiworld.itempool:
+                if item.player == self.player:
+                    pool_items_by_name.setdefault(item.name, []).append(item)
+        placed_item_ids: set[int] = set()
+
         for location in locations_with_placements:
             manual_location = manual_locations_with_placements[location.name]
-            eligible_items = []
             eligible_item_names = []
             forbidden_item_names = []
             place_messages = []
@@ -275,7 +317,7 @@ class ManualWorld(World):
                 place_messages.append('", "'.join(manual_location["place_item"]))
 
             if manual_location.get("place_item_category"):
-                eligible_item_names += [i["name"] for i in item_name_to_item.values() if "category" in i and set(i["category"]).intersection(manual_location["place_item_category"])]
+                eligible_item_names += get_category_item_names(manual_location["place_item_category"])
                 place_messages.append('", "'.join(manual_location["place_item_category"]) + " category(ies)")
 
             # Second we check for forbidden items names
@@ -284,27 +326,36 @@ class ManualWorld(World):
                 forbid_messages.append('", "'.join(manual_location["dont_place_item"]) + ' items')
 
             if manual_location.get("dont_place_item_category"):
-                forbidden_item_names += [i["name"] for i in item_name_to_item.values() if "category" in i and set(i["category"]).intersection(manual_location["dont_place_item_category"])]
+                forbidden_item_names += get_category_item_names(manual_location["dont_place_item_category"])
                 forbid_messages.append('", "'.join(manual_location["dont_place_item_category"]) + ' category(ies)')
 
             # If we forbid some names, check for those in the possible names and remove them
-            if forbidden_item_names:
-                eligible_item_names = [name for name in eligible_item_names if name not in forbidden_item_names]
-
-            if eligible_item_names:
-                eligible_items = [item for item in self.multiworld.itempool if item.player == self.player and item.name in eligible_item_names]
+            forbidden_names = set(forbidden_item_names)
+            eligible_pools = [pool_items_by_name[name] for name in dict.fromkeys(eligible_item_names)
+                              if name not in forbidden_names and pool_items_by_name.get(name)]
+            eligible_count = sum(len(items) for items in eligible_pools)
 
-            if len(eligible_items) == 0:
+            if eligible_count == 0:
                 nl = "\n"
                 if forbidden_item_names:
                     raise Exception(f'Could not find a suitable item to place at "{manual_location["name"]}".\n    No items that match "{f"{nl}     or ".join(place_messages)}"\n    Maybe because of forbidden "{f"{nl}     or ".join(forbid_messages)}"')
                 raise Exception(f'Could not find a suitable item to place at "{manual_location["name"]}". \n    No items that match "{f"{nl}     or ".join(place_messages)}"')
 
-            item_to_place = self.random.choice(eligible_items)
+            # pick uniformly among every eligible item, then take it out of its name's list by swapping it with the last one
+            index = self.random.randrange(eligible_count)
+            for items in eligible_pools:
+                if index < len(items):
+                    break
+                index -= len(items)
+            item_to_place = items[index]
+            items[index] = items[-1]
+            items.pop()
             location.place_locked_item(item_to_place)
+            placed_item_ids.add(id(item_to_place))
 
-            # remove the item we're about to place from the pool so it isn't placed twice
-            self.multiworld.itempool.remove(item_to_place)
+        # remove the items we placed from the pool so they aren't placed twice, in one pass instead of one remove per item
+        if placed_item_ids:
+            self.multiworld.itempool[:] = [item for item in self.multiworld.itempool if id(item) not in placed_item_ids]
 
 
         after_generate_basic(self, self.multiworld, self.player)
@@ -314,10 +365,12 @@ class ManualWorld(World):
             from Utils import visualize_regions
             visualize_regions(self.multiworld.get_region("Menu", self.player), f"{self.game}_{self.player}.puml")
 
+    @profile_stage
     def pre_fill(self):
         # DataValidation after all the hooks are done but before fill
         runPreFillDataValidation(self, self.multiworld)
 
+    @profile_stage
     def fill_slot_data(self):
         slot_data = before_fill_slot_data({}, self, self.multiworld, self.player)
 
@@ -332,15 +385,21 @@ class ManualWorld(World):
 
         return slot_data
 
+    @profile_stage
     def generate_output(self, output_directory: str):
+        if self.stage_profiler:
+            self.stage_profiler.output_path = os.path.join(output_directory, f"{self.multiworld.get_out_file_name_base(self.player)}_stages.json")
+
         data = self.client_data()
         filename = f"{self.multiworld.get_out_file_name_base(self.player)}.apmanual"
         with open(os.path.join(output_directory, filename), 'wb') as f:
             f.write(b64encode(bytes(json.dumps(data), 'utf-8')))
 
+    @profile_stage
     def write_spoiler(self, spoiler_handle):
         before_write_spoiler(self, self.multiworld, spoiler_handle)
 
+    @profile_stage
     def extend_hint_information(self, hint_data: dict[int, dict[int, str]]) -> None:
         before_extend_hint_information(hint_data, self, self.multiworld, self.player)
 
@@ -358,6 +417,9 @@ class ManualWorld(World):
     # Non-standard AP world methods
     ###
 
+    stage_profiler: Optional[StageProfiler] = None
+    """Set by generate_early when "enable_stage_profiler" is enabled in meta.json, or the MANUAL_PROFILE_STAGES environment variable is set"""
+
     rules_functions_maximum_recursion: int = 5
     """Default: 5\n
     The maximum time a location/region's requirement can loop to check for functions\n
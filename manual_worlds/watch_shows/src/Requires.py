@@ -0,0 +1,343 @@
+from dataclasses import dataclass, replace
+from enum import IntEnum
+from functools import lru_cache
+from typing import Any, Callable, Iterator, Optional, Union
+
+import math
+import re
+
+
+class LogicErrorSource(IntEnum):
+    INFIX_TO_POSTFIX = 1 # includes more closing parentheses than opening (but not the opposite)
+    EVALUATE_POSTFIX = 2 # includes missing pipes and missing value on either side of AND/OR
+    EVALUATE_STACK_SIZE = 3 # includes missing curly brackets
+    INVALID_ITEM_COUNT = 4 # includes counts that are not a number, a percentage, all or half
+
+class RequiresSyntaxError(ValueError):
+    """Raised by parse_requires when a requires string cannot be parsed.
+    \nRules.py turns it into a KeyError that names the offending location/region using construct_logic_error."""
+    def __init__(self, source: LogicErrorSource, requires: str):
+        super().__init__(f"Invalid requires '{requires}' (ERROR {source})")
+        self.source = source
+        self.requires = requires
+
+
+######################
+# Requires nodes
+######################
+
+Amount = Union[int, str]
+"""Either an absolute count or one of the relative amounts 'all', 'half' or 'N%'"""
+
+@dataclass(frozen=True)
+class ItemNode:
+    """|Item Name:amount|"""
+    name: str
+    amount: Amount = 1
+
+@dataclass(frozen=True)
+class CategoryNode:
+    """|@Category Name:amount|"""
+    name: str
+    amount: Amount = 1
+
+@dataclass(frozen=True)
+class FunctionNode:
+    """{FunctionName(raw, args)}, args are kept as the raw string found between the parentheses"""
+    name: str
+    args: str
+
+@dataclass(frozen=True)
+class ConstantNode:
+    value: bool
+
+@dataclass(frozen=True)
+class NotNode:
+    operand: "RequiresNode"
+
+@dataclass(frozen=True)
+class AndNode:
+    operands: tuple["RequiresNode", ...]
+
+@dataclass(frozen=True)
+class OrNode:
+    operands: tuple["RequiresNode", ...]
+
+@dataclass(frozen=True)
+class TemplateNode:
+    """A requires string with functions inside of |pipes|, eg. |Coin:{CoinCount()}|.
+    \nThose can only be parsed once the functions have been executed, so the raw string is kept."""
+    text: str
+
+RequiresNode = Union[ItemNode, CategoryNode, FunctionNode, ConstantNode, NotNode, AndNode, OrNode, TemplateNode]
+
+
+######################
+# Parsing
+######################
+
+FUNCTION_PATTERN = re.compile(r'\{(\w+)\((.*?)\)\}')
+OPERATOR_PATTERN = re.compile(r'(and|or)\b', re.IGNORECASE)
+
+ESCAPABLE_CHARACTERS = "\\|:"
+"""Characters that must be preceded by a backslash to be part of an item/category name in requires"""
+
+def escape_requires_name(name: str) -> str:
+    """Escape an item/category name so it can be used as is in requires, eg. 'Re:Start' becomes 'Re\\:Start'"""
+    return "".join("\\" + char if char in ESCAPABLE_CHARACTERS else char for char in name)
+
+def _unescape(text: str) -> str:
+    return re.sub(r'\\([\\|:])', r'\1', text)
+
+def _find_unescaped(text: str, char: str, start: int = 0) -> int:
+    """Same as str.find, except that characters escaped with a backslash are skipped"""
+    i = start
+    while i < len(text):
+        if text[i] == "\\" and i + 1 < len(text) and text[i + 1] in ESCAPABLE_CHARACTERS:
+            i += 2
+        elif text[i] == char:
+            return i
+        else:
+            i += 1
+    return -1
+
+def iter_requires_items(requires: str) -> Iterator[str]:
+    """Yield the raw text found between each pair of |pipes| in a requires string, without the pipes"""
+    start = _find_unescaped(requires, "|")
+    while start != -1:
+        end = _find_unescaped(requires, "|", start + 1)
+        if end == -1:
+            return
+        if end > start + 1:
+            yield requires[start + 1:end]
+        start = _find_unescaped(requires, "|", end + 1)
+
+def split_requires_item(text: str) -> tuple[str, Optional[str]]:
+    """Split an "Item:count" into its unescaped item name and its count, which is None when there's no count"""
+    separator = _find_unescaped(text, ":")
+    if separator == -1:
+        return _unescape(text), None
+    end = _find_unescaped(text, ":", separator + 1)
+    return _unescape(text[:separator]), text[separator + 1:] if end == -1 else text[separator + 1:end]
+
+def parse_amount(count: str) -> Amount:
+    """Convert the part after the ':' of an |item:count| to an Amount, raise ValueError if it's not a valid one."""
+    count = count.strip()
+    if count.lower() in ("all", "half"):
+        return count.lower()
+    if count.endswith("%") and len(count) > 1:
+        float(count[:-1])
+        return count
+    return int(count)
+
+def resolve_amount(amount: Amount, total: int) -> int:
+    """Convert an Amount to the absolute count it represents, total being the count of the item(s) in the pool"""
+    if isinstance(amount, int):
+        return amount
+    if amount == "all":
+        return total
+    if amount == "half":
+        return int(total / 2)
+    percent = min(max(float(amount[:-1]) / 100, 0), 1)
+    return math.ceil(total * percent)
+
+def _parse_item(text: str, requires: str) -> Union[ItemNode, CategoryNode]:
+    is_category = text.startswith("@")
+    item_name, count = split_requires_item(text.lstrip("@$"))
+    amount: Amount = 1
+
+    if count is not None:
+        item_name = item_name.strip()
+        try:
+            amount = parse_amount(count)
+        except ValueError:
+            raise RequiresSyntaxError(LogicErrorSource.INVALID_ITEM_COUNT, requires)
+
+    if is_category:
+        return CategoryNode(item_name, amount)
+    return ItemNode(item_name, amount)
+
+def _tokenize(requires: str) -> list:
+    """Split a requires string into nodes and the operator strings '(', ')', '!', 'and', 'or'.
+    \nAnything else that isn't understood is skipped, the same way the old postfix parser did."""
+    tokens = []
+    i = 0
+    while i < len(requires):
+        char = requires[i]
+
+        if char in "()!":
+            tokens.append(char)
+            i += 1
+        elif char == "{" and (match := FUNCTION_PATTERN.match(requires, i)):
+            tokens.append(FunctionNode(match.group(1), match.group(2)))
+            i = match.end()
+        elif char == "|":
+            end = _find_unescaped(requires, "|", i + 1)
+            if end <= i + 1:
+                raise RequiresSyntaxError(LogicErrorSource.EVALUATE_POSTFIX, requires)
+            item = requires[i + 1:end]
+            if FUNCTION_PATTERN.search(item):
+                return [TemplateNode(requires)]
+            tokens.append(_parse_item(item, requires))
+            i = end + 1
+        elif (i == 0 or not requires[i - 1].isalnum()) and (match := OPERATOR_PATTERN.match(requires, i)):
+            tokens.append(match.group(1).lower())
+            i = match.end()
+        elif char in "01":
+            tokens.append(ConstantNode(char == "1"))
+            i += 1
+        else:
+            i += 1
+    return tokens
+
+@lru_cache(maxsize=None)
+def parse_requires(requires: str) -> RequiresNode:
+    """Parse a boolean requires string like "|A| and (|@B:2| or {YamlEnabled(c)})" into a tree of nodes.
+    \nAND and OR have the same precedence and are evaluated left to right, ! applies to the operand right after it.
+    \nResults are cached since many locations tend to share the same requires."""
+    if not requires.strip():
+        return ConstantNode(True)
+
+    tokens = _tokenize(requires)
+    position = 0
+
+    def peek():
+        return tokens[position] if position < len(tokens) else None
+
+    def parse_expression() -> RequiresNode:
+        nonlocal position
+        node = parse_unary()
+        while peek() in ("and", "or"):
+            node_type = AndNode if tokens[position] == "and" else OrNode
+            position += 1
+            right = parse_unary()
+            if isinstance(node, node_type):
+                node = node_type(node.operands + (right,))
+            else:
+                node = node_type((node, right))
+        return node
+
+    def parse_unary() -> RequiresNode:
+        nonlocal position
+        token = peek()
+        if token == "!":
+            position += 1
+            return NotNode(parse_unary())
+        if token == "(":
+            position += 1
+            node = parse_expression()
+            # A missing closing parenthesis at the end of the requires has always been tolerated
+            if peek() == ")":
+                position += 1
+            elif peek() is not None:
+                raise RequiresSyntaxError(LogicErrorSource.EVALUATE_STACK_SIZE, requires)
+            return node
+        if token is None or isinstance(token, str):
+            raise RequiresSyntaxError(LogicErrorSource.EVALUATE_POSTFIX, requires)
+        position += 1
+        return token
+
+    root = parse_expression()
+    if peek() == ")":
+        raise RequiresSyntaxError(LogicErrorSource.INFIX_TO_POSTFIX, requires)
+    if peek() is not None:
+        raise RequiresSyntaxError(LogicErrorSource.EVALUATE_STACK_SIZE, requires)
+    return root
+
+RequiresTree = dict[str, Any]
+"""A requires built as data instead of a string, like the spec's Requires helpers produce.
+\nIt's made of {"item": name}, {"category": name}, {"all_of": [...]} and {"any_of": [...]}, item and category taking an optional "amount".
+Requires strings can also be used in place of any of those."""
+
+def parse_requires_tree(tree: Union[RequiresTree, str]) -> RequiresNode:
+    """Convert a RequiresTree to the same nodes parse_requires returns, without going through a string"""
+    if isinstance(tree, str):
+        return parse_requires(tree)
+
+    if "item" in tree or "category" in tree:
+        amount = tree.get("amount", 1)
+        if not isinstance(amount, int):
+            try:
+                amount = parse_amount(str(amount))
+            except ValueError:
+                raise RequiresSyntaxError(LogicErrorSource.INVALID_ITEM_COUNT, requires_tree_to_string(tree))
+        if "item" in tree:
+            return ItemNode(tree["item"], amount)
+        return CategoryNode(tree["category"], amount)
+
+    if "all_of" in tree or "any_of" in tree:
+        node_type = AndNode if "all_of" in tree else OrNode
+        operands = tuple(parse_requires_tree(operand) for operand in tree["all_of" if node_type is AndNode else "any_of"])
+        if not operands:
+            return ConstantNode(node_type is AndNode)
+        if len(operands) == 1:
+            return operands[0]
+        return node_type(operands)
+
+    raise RequiresSyntaxError(LogicErrorSource.EVALUATE_POSTFIX, str(tree))
+
+def requires_tree_to_string(tree: Union[RequiresTree, str]) -> str:
+    """Write a RequiresTree as the equivalent requires string, for the places that only understand those"""
+    if isinstance(tree, str):
+        return tree
+
+    if "item" in tree or "category" in tree:
+        result = "|" + escape_requires_name(tree["item"]) if "item" in tree else "|@" + escape_requires_name(tree["category"])
+        if "amount" in tree:
+            result += f":{tree['amount']}"
+        return result + "|"
+
+    if "all_of" in tree:
+        return "(" + " and ".join(requires_tree_to_string(operand) for operand in tree["all_of"]) + ")"
+    return "(" + " or ".join(requires_tree_to_string(operand) for operand in tree.get("any_of", [])) + ")"
+
+def split_function_args(args: str) -> list[str]:
+    """Split the raw arguments of a {Function(a,b)} call the same way every requires function always received them"""
+    func_args = args.split(",")
+    if func_args == ['']:
+        func_args.pop()
+    return func_args
+
+def resolve_relative_amounts(node: RequiresNode, get_total: Callable[[Union[ItemNode, CategoryNode]], int]) -> RequiresNode:
+    """Return node with every 'all', 'half' and 'N%' amount replaced by the absolute count it represents.
+    \nget_total receives each item/category node with a relative amount and returns the count it is relative to."""
+    if isinstance(node, (ItemNode, CategoryNode)):
+        if isinstance(node.amount, int):
+            return node
+        return replace(node, amount=resolve_amount(node.amount, get_total(node)))
+
+    if isinstance(node, NotNode):
+        return NotNode(resolve_relative_amounts(node.operand, get_total))
+
+    if isinstance(node, (AndNode, OrNode)):
+        return type(node)(tuple(resolve_relative_amounts(operand, get_total) for operand in node.operands))
+
+    return node
+
+def simplify_requires(node: RequiresNode) -> RequiresNode:
+    """Remove the branches of node made irrelevant by constants, eg. "|A| or 1" becomes 1 and "|A| and 1" becomes |A|"""
+    if isinstance(node, NotNode):
+        operand = simplify_requires(node.operand)
+        if isinstance(operand, ConstantNode):
+            return ConstantNode(not operand.value)
+        return NotNode(operand)
+
+    if isinstance(node, (AndNode, OrNode)):
+        # the value that decides the result on its own, False for AND and True for OR
+        decisive = isinstance(node, OrNode)
+        operands = []
+        for operand in node.operands:
+            operand = simplify_requires(operand)
+            if isinstance(operand, ConstantNode):
+                if operand.value == decisive:
+                    return operand
+                continue
+            operands.append(operand)
+
+        if not operands:
+            return ConstantNode(not decisive)
+        if len(operands) == 1:
+            return operands[0]
+        return type(node)(tuple(operands))
+
+    return node
@@ -1,11 +1,14 @@
-from typing import TYPE_CHECKING, Optional
-from enum import IntEnum
+from typing import TYPE_CHECKING, Any, Callable, Optional
 from operator import eq, ge, le
 
 from .Regions import regionMap
+from .Meta import enable_requires_profiler
+from .Profiling import RequiresProfiler
 from .hooks import Rules
-from .Helpers import clamp, is_item_enabled, is_option_enabled, get_option_value, convert_string_to_type,\
-    format_to_valid_identifier, format_state_prog_items_key, ProgItemsCat
+from .Helpers import clamp, is_option_enabled, convert_string_to_type,\
+    format_to_valid_identifier, format_state_prog_items_key, format_category_prog_items_key, ProgItemsCat, state_independent, is_state_independent
+from .Requires import LogicErrorSource, RequiresSyntaxError, FUNCTION_PATTERN, RequiresTree, parse_requires, resolve_amount, resolve_relative_amounts, simplify_requires, split_function_args, split_requires_item, iter_requires_items, escape_requires_name, \
+    ItemNode, CategoryNode, FunctionNode, ConstantNode, NotNode, AndNode, OrNode, TemplateNode, RequiresNode
 
 from BaseClasses import MultiWorld, CollectionState
 from worlds.AutoWorld import World
@@ -13,18 +16,11 @@ from worlds.generic.Rules import set_rule, add_rule
 from Options import Choice, Toggle, Range, NamedRange
 
 import re
-import math
 import inspect
-import logging
 
 if TYPE_CHECKING:
     from . import ManualWorld
 
-class LogicErrorSource(IntEnum):
-    INFIX_TO_POSTFIX = 1 # includes more closing parentheses than opening (but not the opposite)
-    EVALUATE_POSTFIX = 2 # includes missing pipes and missing value on either side of AND/OR
-    EVALUATE_STACK_SIZE = 3 # includes missing curly brackets
-
 def construct_logic_error(location_or_region: dict, source: LogicErrorSource) -> KeyError:
     object_type = "location/region"
     object_name = location_or_region.get("name", "Unknown")
@@ -40,268 +36,412 @@ def construct_logic_error(location_or_region: dict, source: LogicErrorSource) ->
         source_text = "There may be missing || around item names, or an AND/OR that is missing a value on one side, or other invalid syntax for the requires."
     elif source == LogicErrorSource.EVALUATE_STACK_SIZE:
         source_text = "There may be missing {} around requirement functions like YamlEnabled() / YamlDisabled(), or other invalid syntax for the requires."
+    elif source == LogicErrorSource.INVALID_ITEM_COUNT:
+        source_text = "There may be an item or category count that is not a number, a percentage, ALL or HALF."
     else:
         source_text = "This requires includes invalid syntax."
 
     return KeyError(f"Invalid 'requires' for {object_type} '{object_name}': {source_text} (ERROR {source})")
 
-def infix_to_postfix(expr, location):
-    prec = {"&": 2, "|": 2, "!": 3}
-    stack = []
-    postfix = ""
-
-    try:
-        for c in expr:
-            if c.isnumeric():
-                postfix += c
-            elif c in prec:
-                while stack and stack[-1] != "(" and prec[c] <= prec[stack[-1]]:
-                    postfix += stack.pop()
-                stack.append(c)
-            elif c == "(":
-                stack.append(c)
-            elif c == ")":
-                while stack and stack[-1] != "(":
-                    postfix += stack.pop()
-                stack.pop()
-
-        while stack:
-            postfix += stack.pop()
-    except Exception:
-        raise construct_logic_error(location, LogicErrorSource.INFIX_TO_POSTFIX)
-
-    return postfix
-
-
-def evaluate_postfix(expr: str, location: str) -> bool:
-    stack = []
-
-    try:
-        for c in expr:
-            if c == "0":
-                stack.append(False)
-            elif c == "1":
-                stack.append(True)
-            elif c == "&":
-                op2 = stack.pop()
-                op1 = stack.pop()
-                stack.append(op1 and op2)
-            elif c == "|":
-                op2 = stack.pop()
-                op1 = stack.pop()
-                stack.append(op1 or op2)
-            elif c == "!":
-                op = stack.pop()
-                stack.append(not op)
-    except Exception:
-        raise construct_logic_error(location, LogicErrorSource.EVALUATE_POSTFIX)
-
-    if len(stack) != 1:
-        raise construct_logic_error(location, LogicErrorSource.EVALUATE_STACK_SIZE)
-
-    return stack.pop()
-
 def set_rules(world: "ManualWorld", multiworld: MultiWorld, player: int):
-    # this is only called when the area (think, location or region) has a "requires" field that is a string
-    def checkRequireStringForArea(state: CollectionState, area: dict):
-        requires_list = area["requires"]
-
-        # Get the "real" item counts of item in the pool/placed/starting_items
-        items_counts = world.get_item_counts(player, only_progression=True)
-
-        # Preparing some variables for exception messages
+    # Preparing some variables for exception messages
+    def describeArea(area: dict) -> tuple[str, str]:
         area_type = "region" if area.get("is_region",False) else "location"
         area_name = area.get("name", f"unknown with these parameters: {area}")
+        return area_type, area_name
 
-        if requires_list == "":
-            return True
+    def findFunction(func_name: str, area: dict) -> Callable:
+        func = globals().get(func_name)
 
-        def findAndRecursivelyExecuteFunctions(requires_list: str, recursionDepth: int = 0) -> str:
-            found_functions = re.findall(r'\{(\w+)\((.*?)\)\}', requires_list)
-            if found_functions:
-                if recursionDepth > world.rules_functions_maximum_recursion:
-                    raise RecursionError(f'One or more functions in {area_type} "{area_name}"\'s requires looped too many time (maximum recursion is {world.rules_functions_maximum_recursion}) \
-                                         \n    As of this Exception the following function(s) are waiting to run: {[f[0] for f in found_functions]} \
-                                         \n    And the currently processed requires look like this: "{requires_list}"')
-                else:
-                    for item in found_functions:
-                        func_name = item[0]
-                        func_args = item[1].split(",")
-                        if func_args == ['']:
-                            func_args.pop()
-
-                        func = globals().get(func_name)
-
-                        if func is None:
-                            func = getattr(Rules, func_name, None)
-
-                        if not callable(func):
-                            raise ValueError(f'Invalid function "{func_name}" in {area_type} "{area_name}".')
-
-                        convert_req_function_args(state, func, func_args, area_name)
-                        try:
-                            result = func(*func_args)
-                        except Exception as ex:
-                            raise RuntimeError(f'A call to the function "{func_name}" in {area_type} "{area_name}"\'s requires raised an Exception. \
-                                                \nUnless it was called by another function, it should look something like "{{{func_name}({item[1]})}}" in {area_type}s.json. \
-                                                \nFull error message: \
-                                                \n\n{type(ex).__name__}: {ex}')
-                        if isinstance(result, bool):
-                            requires_list = requires_list.replace("{" + func_name + "(" + item[1] + ")}", "1" if result else "0")
-                        else:
-                            requires_list = requires_list.replace("{" + func_name + "(" + item[1] + ")}", str(result))
-
-                requires_list = findAndRecursivelyExecuteFunctions(requires_list, recursionDepth + 1)
-            return requires_list
-
-        requires_list = findAndRecursivelyExecuteFunctions(requires_list)
-
-        # parse user written statement into list of each item
-        for item in re.findall(r'\|[^|]+\|', requires_list):
-            require_type = 'item'
-
-            if '|@' in item:
-                require_type = 'category'
-
-            item_base = item
-            item = item.lstrip('|@$').rstrip('|')
-
-            item_parts = item.split(":")  # type: list[str]
-            item_name = item
-            item_count = "1"
-
-
-            if len(item_parts) > 1:
-                item_name = item_parts[0].strip()
-                item_count = item_parts[1].strip()
-
-            total = 0
-
-            if require_type == 'category':
-                category_items = [item for item in world.item_name_to_item.values() if "category" in item and item_name in item["category"]]
-                category_items_counts = sum([items_counts.get(category_item["name"], 0) for category_item in category_items])
-                if item_count.lower() == 'all':
-                    item_count = category_items_counts
-                elif item_count.lower() == 'half':
-                    item_count = int(category_items_counts / 2)
-                elif item_count.endswith('%') and len(item_count) > 1:
-                    percent = clamp(float(item_count[:-1]) / 100, 0, 1)
-                    item_count = math.ceil(category_items_counts * percent)
+        if func is None:
+            func = getattr(Rules, func_name, None)
+
+        if not callable(func):
+            area_type, area_name = describeArea(area)
+            raise ValueError(f'Invalid function "{func_name}" in {area_type} "{area_name}".')
+
+        return func
+
+    def convert_req_function_args(state: CollectionState, func, args: list[str], areaName: str):
+        parameters = inspect.signature(func).parameters
+        knownParameters = [World, 'ManualWorld', MultiWorld, CollectionState]
+        index = -1
+        for parameter in parameters.values():
+            target_type = parameter.annotation
+            index += 1
+            if target_type in knownParameters:
+                if target_type in [World, 'ManualWorld']:
+                    args.insert(index, world)
+                elif target_type == MultiWorld:
+                    args.insert(index, multiworld)
+                elif target_type == CollectionState:
+                    args.insert(index, state)
+                continue
+            if parameter.name.lower() == "player":
+                args.insert(index, player)
+                continue
+
+            if index < len(args) and args[index] != "":
+                value = args[index].strip()
+            else:
+                if parameter.default is not inspect.Parameter.empty:
+                    if index < len(args):
+                        args[index] = parameter.default
+                    else:
+                        args.insert(index, parameter.default)
+                    continue
                 else:
-                    try:
-                        item_count = int(item_count)
-                    except ValueError as e:
-                        raise ValueError(f"Invalid item count `{item_name}` in {area}.") from e
-
-                for category_item in category_items:
-                    total += state.count(category_item["name"], player)
-
-                    if total >= item_count:
-                        requires_list = requires_list.replace(item_base, "1")
-            elif require_type == 'item':
-                item_current_count = items_counts.get(item_name, 0)
-                if item_count.lower() == 'all':
-                    item_count = item_current_count
-                elif item_count.lower() == 'half':
-                    item_count = int(item_current_count / 2)
-                elif item_count.endswith('%') and len(item_count) > 1:
-                    percent = clamp(float(item_count[:-1]) / 100, 0, 1)
-                    item_count = math.ceil(item_current_count * percent)
+                    if parameter.annotation is inspect.Parameter.empty:
+                        raise Exception(f"A call of the \"{func.__name__}\" function in \"{areaName}\"'s requirement, asks for a value for its argument \"{parameter.name}\" but it's missing.")
+                    else:
+                        raise Exception(f"A call of the \"{func.__name__}\" function in \"{areaName}\"'s requirement, asks for a value of type {target_type} for its argument \"{parameter.name}\" but it's missing.")
+
+            if target_type == str or parameter.annotation is inspect.Parameter.empty: #Don't convert since its already a string or if we don't know the type to convert to
+                args[index] = value
+                continue
+
+            try:
+                value = convert_string_to_type(value, target_type)
+
+            except Exception as e:
+                raise Exception(f"A call of the \"{func.__name__}\" function in \"{areaName}\"'s requirement, asks for a value of type {target_type}\nfor its argument \"{parameter.name}\" but its value \"{value}\" cannot be converted to {target_type} \nOriginal Error:'{e}'")
+
+            args[index] = value
+
+    # The arguments of a function call never change, so they're converted once and only the state gets swapped in on each call
+    function_callers: dict[tuple[str, str, str], Callable[[CollectionState], Any]] = {}
+    def compileFunctionCall(func: Callable, func_name: str, raw_args: str, area: dict) -> Callable[[CollectionState], Any]:
+        area_type, area_name = describeArea(area)
+        if (func_name, raw_args, area_name) in function_callers:
+            return function_callers[func_name, raw_args, area_name]
+
+        func_args = split_function_args(raw_args)
+        state_placeholder = object()
+        convert_req_function_args(state_placeholder, func, func_args, area_name)
+        state_indexes = [index for index, arg in enumerate(func_args) if arg is state_placeholder]
+
+        def callFunction(state: CollectionState):
+            args = func_args
+            if state_indexes:
+                args = func_args.copy()
+                for index in state_indexes:
+                    args[index] = state
+            try:
+                return func(*args)
+            except Exception as ex:
+                raise RuntimeError(f'A call to the function "{func_name}" in {area_type} "{area_name}"\'s requires raised an Exception. \
+                                    \nUnless it was called by another function, it should look something like "{{{func_name}({raw_args})}}" in {area_type}s.json. \
+                                    \nFull error message: \
+                                    \n\n{type(ex).__name__}: {ex}')
+
+        function_callers[func_name, raw_args, area_name] = callFunction
+        return callFunction
+
+    def executeFunction(state: CollectionState, func: Callable, func_name: str, raw_args: str, area: dict):
+        return compileFunctionCall(func, func_name, raw_args, area)(state)
+
+    def raiseRecursionError(area: dict, function_names: list[str], requires: str):
+        area_type, area_name = describeArea(area)
+        raise RecursionError(f'One or more functions in {area_type} "{area_name}"\'s requires looped too many time (maximum recursion is {world.rules_functions_maximum_recursion}) \
+                             \n    As of this Exception the following function(s) are waiting to run: {function_names} \
+                             \n    And the currently processed requires look like this: "{requires}"')
+
+    # only used for requires with functions inside of |pipes|, those need the function results before they can be parsed
+    def findAndRecursivelyExecuteFunctions(state: CollectionState, requires_list: str, area: dict, recursionDepth: int = 0) -> str:
+        found_functions = FUNCTION_PATTERN.findall(requires_list)
+        if found_functions:
+            if recursionDepth > world.rules_functions_maximum_recursion:
+                raiseRecursionError(area, [f[0] for f in found_functions], requires_list)
+            for item in found_functions:
+                func_name = item[0]
+                result = executeFunction(state, findFunction(func_name, area), func_name, item[1], area)
+                if isinstance(result, bool):
+                    requires_list = requires_list.replace("{" + func_name + "(" + item[1] + ")}", "1" if result else "0")
                 else:
-                    item_count = int(item_count)
+                    requires_list = requires_list.replace("{" + func_name + "(" + item[1] + ")}", str(result))
 
-                total = state.count(item_name, player)
+            requires_list = findAndRecursivelyExecuteFunctions(state, requires_list, area, recursionDepth + 1)
+        return requires_list
 
-                if total >= item_count:
-                    requires_list = requires_list.replace(item_base, "1")
+    def getCategoryItems(category_name: str) -> tuple[str, ...]:
+        return world.category_item_names.get(category_name, ())
 
-            if total <= item_count:
-                requires_list = requires_list.replace(item_base, "0")
+    # Once create_items has counted the pool, all/half/N% amounts can be turned into plain numbers before compiling
+    amounts_are_fixed = player in world.item_counts_progression
 
-        requires_list = re.sub(r'\s?\bAND\b\s?', '&', requires_list, 0, re.IGNORECASE)
-        requires_list = re.sub(r'\s?\bOR\b\s?', '|', requires_list, 0, re.IGNORECASE)
+    def getPoolTotal(node: ItemNode | CategoryNode) -> int:
+        items_counts = world.get_item_counts(player, only_progression=True)
+        if isinstance(node, ItemNode):
+            return items_counts.get(node.name, 0)
+        return sum(items_counts.get(name, 0) for name in getCategoryItems(node.name))
 
-        requires_string = infix_to_postfix("".join(requires_list), area)
-        return (evaluate_postfix(requires_string, area))
+    parsed_requires: dict[tuple[str, int], RequiresNode] = {}
+    def parseRequireString(requires: str, area: dict, recursionDepth: int) -> RequiresNode:
+        if (requires, recursionDepth) in parsed_requires:
+            return parsed_requires[requires, recursionDepth]
 
-    # this is only called when the area (think, location or region) has a "requires" field that is a dict
-    def checkRequireDictForArea(state: CollectionState, area: dict):
-        canAccess = True
+        try:
+            node = parse_requires(requires)
+        except RequiresSyntaxError as ex:
+            raise construct_logic_error(area, ex.source) from ex
 
-        for item in area["requires"]:
-            # if the require entry is an object with "or" or a list of items, treat it as a standalone require of its own
-            if (isinstance(item, dict) and "or" in item and isinstance(item["or"], list)) or (isinstance(item, list)):
-                canAccessOr = True
-                or_items = item
+        node = prepareRequireNode(node, area, recursionDepth)
+        parsed_requires[requires, recursionDepth] = node
+        return node
+
+    # requires built by the spec are already structured, so they skip the string parsing entirely
+    parsed_trees: dict[int, RequiresNode] = {}
+    def parseRequireTree(tree: RequiresTree, area: dict) -> RequiresNode:
+        if id(tree) in parsed_trees:
+            return parsed_trees[id(tree)]
+
+        try:
+            node = world.compiled_world.parse_requires_tree(tree)
+        except RequiresSyntaxError as ex:
+            raise construct_logic_error(area, ex.source) from ex
+
+        parsed_trees[id(tree)] = prepareRequireNode(node, area, 0)
+        return parsed_trees[id(tree)]
+
+    def prepareRequireNode(node: RequiresNode, area: dict, recursionDepth: int) -> RequiresNode:
+        if amounts_are_fixed:
+            node = resolve_relative_amounts(node, getPoolTotal)
+
+        # the eager mode promises that every function of a requires gets called on every check, so only fold and prune when short-circuiting
+        if world.rules_short_circuit:
+            node = foldStateIndependentFunctions(node, area, recursionDepth)
+            node = simplify_requires(node)
+        return node
+
+    # functions marked with @state_independent only depend on options, so they're called once here instead of on every check
+    def foldStateIndependentFunctions(node: RequiresNode, area: dict, recursionDepth: int) -> RequiresNode:
+        if isinstance(node, FunctionNode):
+            func = findFunction(node.name, area)
+            if not is_state_independent(func):
+                return node
+
+            if recursionDepth > world.rules_functions_maximum_recursion:
+                raiseRecursionError(area, [node.name], f"{{{node.name}({node.args})}}")
+
+            result = executeFunction(None, func, node.name, node.args, area)
+            if isinstance(result, bool):
+                return ConstantNode(result)
+            return parseRequireString(str(result), area, recursionDepth + 1)
+
+        if isinstance(node, NotNode):
+            return NotNode(foldStateIndependentFunctions(node.operand, area, recursionDepth))
+
+        if isinstance(node, (AndNode, OrNode)):
+            return type(node)(tuple(foldStateIndependentFunctions(operand, area, recursionDepth) for operand in node.operands))
+
+        return node
+
+    # requires strings are parsed once, here, and turned into functions that only call state.has/state.count when checked
+    def compileRequireString(requires: str, area: dict, recursionDepth: int = 0) -> Callable[[CollectionState], bool]:
+        return compileRequireNode(parseRequireString(requires, area, recursionDepth), area, recursionDepth)
+
+    # rough cost of evaluating a node, used to order the operands of a short-circuited AND/OR
+    # items and categories are both a single prog_items lookup since categories have their own counters, functions and templates run arbitrary code
+    leaf_costs = {ConstantNode: 0, ItemNode: 1, CategoryNode: 1, FunctionNode: 2, TemplateNode: 2}
+    def requireNodeCost(node: RequiresNode) -> int:
+        if isinstance(node, NotNode):
+            return requireNodeCost(node.operand)
+        if isinstance(node, (AndNode, OrNode)):
+            return max(requireNodeCost(operand) for operand in node.operands)
+        return leaf_costs[type(node)]
+
+    def compileRequireNode(node: RequiresNode, area: dict, recursionDepth: int) -> Callable[[CollectionState], bool]:
+        if isinstance(node, ConstantNode):
+            value = node.value
+            return lambda state: value
+
+        if isinstance(node, ItemNode):
+            item_name = node.name
+            amount = node.amount
+
+            if isinstance(amount, int):
+                return lambda state: state.has(item_name, player, amount)
+
+            # only reached when set_rules runs before create_items counted the pool
+            def checkItem(state: CollectionState) -> bool:
+                # Get the "real" item counts of item in the pool/placed/starting_items
+                item_current_count = world.get_item_counts(player, only_progression=True).get(item_name, 0)
+                return state.has(item_name, player, resolve_amount(amount, item_current_count))
+
+            return checkItem
+
+        if isinstance(node, CategoryNode):
+            category_items = getCategoryItems(node.name)
+            amount = node.amount
+
+            # a category without any item can never be satisfied
+            if not category_items:
+                return lambda state: False
+
+            # ManualWorld.collect/remove keep a running total of the collected items of every category
+            category_key = format_category_prog_items_key(node.name)
+
+            if isinstance(amount, int):
+                return lambda state: state.has(category_key, player, amount)
+
+            def checkCategory(state: CollectionState) -> bool:
+                items_counts = world.get_item_counts(player, only_progression=True)
+                item_count = resolve_amount(amount, sum(items_counts.get(name, 0) for name in category_items))
+                return state.has(category_key, player, item_count)
+
+            return checkCategory
+
+        if isinstance(node, FunctionNode):
+            if recursionDepth > world.rules_functions_maximum_recursion:
+                raiseRecursionError(area, [node.name], f"{{{node.name}({node.args})}}")
+
+            callFunction = compileFunctionCall(findFunction(node.name, area), node.name, node.args, area)
+            compiled_results: dict[str, Callable[[CollectionState], bool]] = {}
+
+            def checkFunction(state: CollectionState) -> bool:
+                result = callFunction(state)
+                if isinstance(result, bool):
+                    return result
+
+                # anything else is a requires string, evaluated in place of the function call
+                result = str(result)
+                if result not in compiled_results:
+                    compiled_results[result] = compileRequireString(result, area, recursionDepth + 1)
+                return compiled_results[result](state)
+
+            return checkFunction
+
+        if isinstance(node, TemplateNode):
+            template = node.text
+            compiled_results: dict[str, Callable[[CollectionState], bool]] = {}
 
-                if isinstance(item, dict):
-                    or_items = item["or"]
+            def checkTemplate(state: CollectionState) -> bool:
+                requires = findAndRecursivelyExecuteFunctions(state, template, area)
+                if requires not in compiled_results:
+                    compiled_results[requires] = compileRequireString(requires, area)
+                return compiled_results[requires](state)
 
-                for or_item in or_items:
-                    or_item_parts = or_item.split(":")
-                    or_item_name = or_item
-                    or_item_count = 1
+            return checkTemplate
 
-                    if len(or_item_parts) > 1:
-                        or_item_name = or_item_parts[0]
-                        or_item_count = int(or_item_parts[1])
+        if isinstance(node, NotNode):
+            operand = compileRequireNode(node.operand, area, recursionDepth)
+            return lambda state: not operand(state)
 
-                    if not state.has(or_item_name, player, or_item_count):
-                        canAccessOr = False
+        if not world.rules_short_circuit:
+            operands = [compileRequireNode(operand, area, recursionDepth) for operand in node.operands]
 
-                if canAccessOr:
-                    canAccess = True
-                    break
+            # every operand is evaluated, like the postfix evaluator always did
+            if isinstance(node, AndNode):
+                def checkAll(state: CollectionState) -> bool:
+                    results = [operand(state) for operand in operands]
+                    return all(results)
+
+                return checkAll
+
+            def checkAny(state: CollectionState) -> bool:
+                results = [operand(state) for operand in operands]
+                return any(results)
+
+            return checkAny
+
+        # cheapest operands first so the expensive ones only run when the cheap ones didn't already decide the result
+        operands = tuple(compileRequireNode(operand, area, recursionDepth) for operand in sorted(node.operands, key=requireNodeCost))
+
+        if isinstance(node, AndNode):
+            def checkAllLazy(state: CollectionState) -> bool:
+                for operand in operands:
+                    if not operand(state):
+                        return False
+                return True
+
+            return checkAllLazy
+
+        def checkAnyLazy(state: CollectionState) -> bool:
+            for operand in operands:
+                if operand(state):
+                    return True
+            return False
+
+        return checkAnyLazy
+
+    # this is only called when the area (think, location or region) has a "requires" field that is a dict
+    # the "Item:count" entries are split once here, then checked with a few grouped state calls
+    def compileRequireDictForArea(area: dict) -> Callable[[CollectionState], bool]:
+        def parseItemCounts(entries) -> dict[str, int]:
+            item_counts: dict[str, int] = {}
+            for entry in entries:
+                item_name, item_count = split_requires_item(entry)
+                item_count = 1 if item_count is None else int(item_count)
+                item_counts[item_name] = max(item_count, item_counts.get(item_name, 0))
+            return item_counts
+
+        required_items = []
+        or_groups: list[dict[str, int]] = []
+        for item in area["requires"]:
+            # if the require entry is an object with "or" or a list of items, treat it as a standalone require of its own
+            if isinstance(item, dict) and "or" in item and isinstance(item["or"], list):
+                or_groups.append(parseItemCounts(item["or"]))
+            elif isinstance(item, list):
+                or_groups.append(parseItemCounts(item))
             else:
-                item_parts = item.split(":")
-                item_name = item
-                item_count = 1
+                required_items.append(item)
 
-                if len(item_parts) > 1:
-                    item_name = item_parts[0]
-                    item_count = int(item_parts[1])
+        required_counts = parseItemCounts(required_items)
+        # any of those standalone requires being fully met is enough to access the area
+        or_single_items = tuple(name for group in or_groups if len(group) == 1 for name, count in group.items() if count == 1)
+        or_groups = [group for group in or_groups if not (len(group) == 1 and 1 in group.values())]
 
-                if not state.has(item_name, player, item_count):
-                    canAccess = False
+        def checkRequireDict(state: CollectionState) -> bool:
+            if or_single_items and state.has_any(or_single_items, player):
+                return True
+            for group in or_groups:
+                if state.has_all_counts(group, player):
+                    return True
+            return state.has_all_counts(required_counts, player)
 
-        return canAccess
+        return checkRequireDict
 
     # handle any type of checking needed, then ferry the check off to a dedicated method for that check
-    def fullLocationOrRegionCheck(state: CollectionState, area: dict):
+    def compileLocationOrRegionRule(area: Optional[dict]) -> Callable[[CollectionState], bool]:
         # if it's not a usable object of some sort, default to true
-        if not area:
-            return True
-
         # don't require the "requires" key for locations and regions if they don't need to use it
-        if "requires" not in area.keys():
-            return True
+        if not area or "requires" not in area.keys():
+            return lambda state: True
 
         if isinstance(area["requires"], str):
-            return checkRequireStringForArea(state, area)
+            return compileRequireString(area["requires"], area)
+        elif isinstance(area["requires"], dict):
+            return compileRequireNode(parseRequireTree(area["requires"], area), area, 0)
         else:  # item access is in dict form
-            return checkRequireDictForArea(state, area)
+            return compileRequireDictForArea(area)
+
+    # Enable this in Meta.json to get a report of the time spent checking every location/region's requires in the output directory
+    world.requires_profiler = RequiresProfiler() if enable_requires_profiler else None
+    def profileRule(area_type: str, area_name: str, rule: Callable[[CollectionState], bool]) -> Callable[[CollectionState], bool]:
+        if world.requires_profiler is None:
+            return rule
+        return world.requires_profiler.wrap(area_type, area_name, rule)
 
-    used_location_names = []
+    used_location_names = set()
+    region_rules: dict[str, Callable[[CollectionState], bool]] = {}
     # Region access rules
     for region in regionMap.keys():
-        used_location_names.extend([l.name for l in multiworld.get_region(region, player).locations])
+        used_location_names.update(l.name for l in multiworld.get_region(region, player).locations)
         if region != "Menu":
-            for exitRegion in multiworld.get_region(region, player).entrances:
-                def fullRegionCheck(state: CollectionState, region=regionMap[region], region_name=exitRegion.name):
-                    region['name'] = region_name
-                    region['is_region'] = True
-
-                    return fullLocationOrRegionCheck(state, region)
+            regionMap[region]['name'] = region
+            regionMap[region]['is_region'] = True
+            region_rules[region] = profileRule("region", region, compileLocationOrRegionRule(regionMap[region]))
 
-                add_rule(world.get_entrance(exitRegion.name), fullRegionCheck)
+            for exitRegion in multiworld.get_region(region, player).entrances:
+                add_rule(world.get_entrance(exitRegion.name), region_rules[region])
             entrance_rules = regionMap[region].get("entrance_requires", {})
             for e in entrance_rules:
                 entrance = world.get_entrance(f'{e}To{region}')
-                add_rule(entrance, lambda state, rule={"requires": entrance_rules[e]}: fullLocationOrRegionCheck(state, rule))
+                add_rule(entrance, profileRule("entrance", entrance.name, compileLocationOrRegionRule({"name": entrance.name, "requires": entrance_rules[e]})))
             exit_rules = regionMap[region].get("exit_requires", {})
             for e in exit_rules:
                 exit = world.get_entrance(f'{region}To{e}')
-                add_rule(exit, lambda state, rule={"requires": exit_rules[e]}: fullLocationOrRegionCheck(state, rule))
+                add_rule(exit, profileRule("entrance", exit.name, compileLocationOrRegionRule({"name": exit.name, "requires": exit_rules[e]})))
 
     # Location access rules
     for location in world.location_table:
@@ -310,28 +450,21 @@ def set_rules(world: "ManualWorld", multiworld: MultiWorld, player: int):
 
         locFromWorld = multiworld.get_location(location["name"], player)
 
-        locationRegion = regionMap[location["region"]] if "region" in location else None
-
-        if locationRegion:
-            locationRegion['name'] = location['region']
-            locationRegion['is_region'] = True
+        regionRule = region_rules.get(location["region"]) if "region" in location else None
 
         if "requires" in location: # Location has requires, check them alongside the region requires
-            def checkBothLocationAndRegion(state: CollectionState, location=location, region=locationRegion):
-                locationCheck = fullLocationOrRegionCheck(state, location)
+            def checkBothLocationAndRegion(state: CollectionState, locationRule=compileLocationOrRegionRule(location), regionRule=regionRule):
+                locationCheck = locationRule(state)
                 regionCheck = True # default to true unless there's a region with requires
 
-                if region:
-                    regionCheck = fullLocationOrRegionCheck(state, region)
+                if regionRule:
+                    regionCheck = regionRule(state)
 
                 return locationCheck and regionCheck
 
-            set_rule(locFromWorld, checkBothLocationAndRegion)
-        elif "region" in location: # Only region access required, check the location's region's requires
-            def fullRegionCheck(state, region=locationRegion):
-                return fullLocationOrRegionCheck(state, region)
-
-            set_rule(locFromWorld, fullRegionCheck)
+            set_rule(locFromWorld, profileRule("location", location["name"], checkBothLocationAndRegion))
+        elif regionRule: # Only region access required, check the location's region's requires
+            set_rule(locFromWorld, profileRule("location", location["name"], regionRule))
         else: # No location region and no location requires? It's accessible.
             def allRegionsAccessible(state):
                 return True
@@ -341,52 +474,6 @@ def set_rules(world: "ManualWorld", multiworld: MultiWorld, player: int):
     # Victory requirement
     multiworld.completion_condition[player] = lambda state: state.has("__Victory__", player)
 
-    def convert_req_function_args(state: CollectionState, func, args: list[str], areaName: str):
-        parameters = inspect.signature(func).parameters
-        knownParameters = [World, 'ManualWorld', MultiWorld, CollectionState]
-        index = -1
-        for parameter in parameters.values():
-            target_type = parameter.annotation
-            index += 1
-            if target_type in knownParameters:
-                if target_type in [World, 'ManualWorld']:
-                    args.insert(index, world)
-                elif target_type == MultiWorld:
-                    args.insert(index, multiworld)
-                elif target_type == CollectionState:
-                    args.insert(index, state)
-                continue
-            if parameter.name.lower() == "player":
-                args.insert(index, player)
-                continue
-
-            if index < len(args) and args[index] != "":
-                value = args[index].strip()
-            else:
-                if parameter.default is not inspect.Parameter.empty:
-                    if index < len(args):
-                        args[index] = parameter.default
-                    else:
-                        args.insert(index, parameter.default)
-                    continue
-                else:
-                    if parameter.annotation is inspect.Parameter.empty:
-                        raise Exception(f"A call of the \"{func.__name__}\" function in \"{areaName}\"'s requirement, asks for a value for its argument \"{parameter.name}\" but it's missing.")
-                    else:
-                        raise Exception(f"A call of the \"{func.__name__}\" function in \"{areaName}\"'s requirement, asks for a value of type {target_type} for its argument \"{parameter.name}\" but it's missing.")
-
-            if target_type == str or parameter.annotation is inspect.Parameter.empty: #Don't convert since its already a string or if we don't know the type to convert to
-                args[index] = value
-                continue
-
-            try:
-                value = convert_string_to_type(value, target_type)
-
-            except Exception as e:
-                raise Exception(f"A call of the \"{func.__name__}\" function in \"{areaName}\"'s requirement, asks for a value of type {target_type}\nfor its argument \"{parameter.name}\" but its value \"{value}\" cannot be converted to {target_type} \nOriginal Error:'{e}'")
-
-            args[index] = value
-
 
 def ItemValue(state: CollectionState, player: int, valueCount: str):
     """When passed a string with this format: 'valueName:int',
@@ -403,6 +490,7 @@ def ItemValue(state: CollectionState, player: int, valueCount: str):
 
 
 # Two useful functions to make require work if an item is disabled instead of making it inaccessible
+@state_independent
 def OptOne(world: "ManualWorld", item: str, items_counts: Optional[dict] = None):
     """Check if the passed item (with or without ||) is enabled, then this returns |item:count|
     where count is clamped to the maximum number of said item in the itempool.\n
@@ -413,35 +501,32 @@ def OptOne(world: "ManualWorld", item: str, items_counts: Optional[dict] = None)
     if not items_counts:
         items_counts = world.get_item_counts(only_progression=True)
 
+    # the item can be passed with or without its |pipes|, names can contain escaped \| and \: like anywhere else in requires
+    item = next(iter_requires_items(item), item) if item.startswith("|") else item
+
     require_type = 'item'
 
-    if '@' in item[:2]:
+    if item.startswith('@'):
         require_type = 'category'
 
-    item = item.lstrip('|@$').rstrip('|')
-
-    item_parts = item.split(":")
-    item_name = item
-    item_count = '1'
-
-    if len(item_parts) > 1:
-        item_name = item_parts[0]
-        item_count = item_parts[1]
+    item_name, item_count = split_requires_item(item.lstrip('@$'))
+    if item_count is None:
+        item_count = '1'
 
     if require_type == 'category':
         if item_count.isnumeric():
             #Only loop if we can use the result to clamp
-            category_items = [item for item in world.item_name_to_item.values() if "category" in item and item_name in item["category"]]
-            category_items_counts = sum([items_counts.get(category_item["name"], 0) for category_item in category_items])
+            category_items_counts = sum(items_counts.get(category_item, 0) for category_item in world.category_item_names.get(item_name, ()))
             item_count = clamp(int(item_count), 0, category_items_counts)
-        return f"|@{item_name}:{item_count}|"
+        return f"|@{escape_requires_name(item_name)}:{item_count}|"
     elif require_type == 'item':
         if item_count.isnumeric():
             item_current_count = items_counts.get(item_name, 0)
             item_count = clamp(int(item_count), 0, item_current_count)
-        return f"|{item_name}:{item_count}|"
+        return f"|{escape_requires_name(item_name)}:{item_count}|"
 
 # OptAll check the passed require string and loop every item to check if they're enabled,
+@state_independent
 def OptAll(world: "ManualWorld", requires: str):
     """Check the passed require string and loop every item to check if they're enabled,
     then returns the require string with items counts adjusted using OptOne\n
@@ -460,12 +545,12 @@ def OptAll(world: "ManualWorld", requires: str):
         functions[func_name] = item[1]
         requires_list = requires_list.replace("{" + func_name + "(" + item[1] + ")}", "{" + func_name + "(temp)}")
     # parse user written statement into list of each item
-    for item in re.findall(r'\|[^|]+\|', requires):
+    for item in iter_requires_items(requires):
         itemScanned = OptOne(world, item, items_counts)
-        requires_list = requires_list.replace(item, itemScanned)
+        requires_list = requires_list.replace(f"|{item}|", itemScanned)
 
     for function in functions:
-        requires_list = requires_list.replace("{" + function + "(temp)}", "{" + func_name + "(" + functions[func_name] + ")}")
+        requires_list = requires_list.replace("{" + function + "(temp)}", "{" + function + "(" + functions[function] + ")}")
     return requires_list
 
 # Rule to expose the can_reach_location core function
@@ -475,14 +560,17 @@ def canReachLocation(state: CollectionState, player: int, location: str):
         return True
     return False
 
+@state_independent
 def YamlEnabled(multiworld: MultiWorld, player: int, param: str) -> bool:
     """Is a yaml option enabled?"""
     return is_option_enabled(multiworld, player, param)
 
+@state_independent
 def YamlDisabled(multiworld: MultiWorld, player: int, param: str) -> bool:
     """Is a yaml option disabled?"""
     return not is_option_enabled(multiworld, player, param)
 
+@state_independent
 def YamlCompare(world: "ManualWorld", multiworld: MultiWorld, state: CollectionState, player: int, args: str, skipCache: bool = False) -> bool:
     """Is a yaml option's value compared using {comparator} to the requested value
     \nFormat it like {YamlCompare(OptionName==value)}
@@ -47,7 +47,7 @@ class ItemData(ItemArgs):
 
 class LocationArgs(TypedDict):
     category: NotRequired[str | list[str]]
-    requires: NotRequired[str]
+    requires: NotRequired[str | dict[str, Any]]
     region: NotRequired[str]
     place_item: NotRequired[list[str]]
     dont_place_item: NotRequired[list[str]]
@@ -69,11 +69,11 @@ class LocationTableData(TypedDict):
 
 
 class RegionData(TypedDict):
-    requires: NotRequired[str]
+    requires: NotRequired[str | dict[str, Any]]
     connects_to: NotRequired[list[str]]
     starting: NotRequired[bool]
-    exit_requires: NotRequired[dict[str, str]]
-    entrance_requires: NotRequired[dict[str, str]]
+    exit_requires: NotRequired[dict[str, str | dict[str, Any]]]
+    entrance_requires: NotRequired[dict[str, str | dict[str, Any]]]
 
 
 class TutorialData(TypedDict):
@@ -2,16 +2,19 @@ from pathlib import Path
 import shutil
 import sys
 from tempfile import TemporaryDirectory
+from typing import Any
 
 from ._manual_worlds import list_project_manual_worlds
-from .inspect import inspect_manual_world
+from .inspect import inspect_data_module, load_manual_world_module
 from ._paths import user_archipelago_worlds_dir
 
 
 def make_apworld(src_dir: Path, output_dir: str | Path) -> Path:
     output_dir = Path(output_dir)
 
-    world_data = inspect_manual_world(src_dir)
+    # loaded once, for the apworld name and for the data snapshot
+    data_module: Any = load_manual_world_module(src_dir, "Data")
+    world_data = inspect_data_module(data_module)
 
     with TemporaryDirectory() as temp_archive_root:
         apworld_base_name = (
@@ -23,6 +26,8 @@ def make_apworld(src_dir: Path, output_dir: str | Path) -> Path:
             dst=Path(temp_archive_root) / apworld_base_name,
         )
 
+        write_data_snapshot(data_module, Path(temp_archive_root) / apworld_base_name)
+
         apworld_zip = shutil.make_archive(
             base_name=apworld_base_name,
             format="zip",
@@ -39,6 +44,18 @@ def make_apworld(src_dir: Path, output_dir: str | Path) -> Path:
     )
 
 
+def write_data_snapshot(data_module: Any, apworld_dir: Path) -> None:
+    """Ship the result of the data pipeline (json files, data hooks and spec) that loading data_module ran
+    in the apworld, so Data.py can load it instead of running the pipeline on every import"""
+    # worlds made from an older template can't load a snapshot
+    if not hasattr(data_module, "write_data_snapshot"):
+        return
+
+    snapshot_path = apworld_dir / "data" / data_module.DATA_SNAPSHOT_FILE
+    if not data_module.write_data_snapshot(str(snapshot_path)):
+        raise Exception(f"Failed to write the data snapshot of {apworld_dir.name}, its tables can't be stored as JSON")
+
+
 def __main():
     available_worlds = [*list_project_manual_worlds()]
 
@@ -42,8 +42,10 @@ class WorldData:
 
 
 def inspect_manual_world(src_dir: Path) -> WorldData:
-    data_module: Any = load_manual_world_module(src_dir, "Data")
+    return inspect_data_module(load_manual_world_module(src_dir, "Data"))
 
+
+def inspect_data_module(data_module: Any) -> WorldData:
     return WorldData(
         game_table=GameData.from_dict(data_module.game_table),
         item_table=__safe_index(data_module, "item_table"),